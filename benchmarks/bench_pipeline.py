@@ -0,0 +1,205 @@
+"""Mide cada etapa del recordatorio con datos sintéticos y un servidor SMTP local.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--employees 2000] [--tasks 20]
+        [--distribution uniform|normal|near] [--backend json|sqlite]
+        [--inserts 200] [--sends 500] [--workers 4] [--scan-workers 0]
+        [--json informe.json]
+
+Genera el conjunto de datos en una carpeta temporal (ver generate_dataset.py)
+y mide, para cada etapa, el tiempo, los elementos por segundo y la memoria
+máxima:
+- load_employees: leer la lista de empleados.
+- load_tasks: cargar y ordenar las tareas de todos los empleados con TaskManager.
+- insert_task: añadir tareas una a una manteniendo la lista ordenada.
+- prepare: buscar las tareas que vencen y preparar los correos (check_and_notify
+  sin enviar); con --scan-workers también leyendo los .json en varios procesos.
+- send_email: enviar correos de uno en uno con EmailNotifier.send_email.
+- dispatch: enviar los mismos correos con el dispatcher (conexiones reutilizadas).
+
+Los correos van a un servidor SMTP local que los acepta y los descarta, así que
+no sale nada a la red. La memoria se mide en una segunda pasada porque
+tracemalloc ralentiza mucho el código.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from generate_dataset import DISTRIBUTIONS, generate, open_target  # noqa: E402
+from core import EmployeeManager, ReminderService, TaskManager, prepare_reminders  # noqa: E402
+from models import Task  # noqa: E402
+from notifier import EmailNotifier  # noqa: E402
+from sharded_scan import ShardedScan  # noqa: E402
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Responde lo justo del protocolo SMTP y descarta los correos."""
+
+    def reply(self, text):
+        self.wfile.write(text.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 sink')
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b'.\r\n':
+                    in_data = False
+                    self.server.count()
+                    self.reply('250 OK')
+                continue
+            command = line[:4].upper()
+            if command == b'DATA':
+                in_data = True
+                self.reply('354 Enviar el mensaje')
+            elif command == b'QUIT':
+                self.reply('221 Adiós')
+                return
+            else:  # EHLO, HELO, MAIL, RCPT, RSET, NOOP
+                self.reply('250 OK')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Servidor SMTP local en un puerto libre que cuenta los correos recibidos."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SinkHandler)
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.received += 1
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def measure(name, setup, items):
+    """Mide una etapa: primero el tiempo y después, aparte, la memoria máxima"""
+    #INPUT
+    #-setup: función que prepara la etapa y devuelve la función que se mide
+    #-items: número de elementos que procesa la etapa (para calcular el ritmo)
+    func = setup()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    func = setup()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {'stage': name, 'items': items, 'seconds': round(seconds, 4),
+              'per_second': round(items / seconds, 1) if seconds else None, 'peak_mb': round(peak / 1e6, 2)}
+    print(f"{name:<22} {items:>9} {seconds:>9.3f} s {result['per_second'] or 0:>12.1f}/s {result['peak_mb']:>9.2f} MB")
+    return result
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as directory, SMTPSink() as sink:
+        storage = open_target(args.backend, directory)
+        start = time.perf_counter()
+        employees = generate(storage, args.employees, args.tasks, args.distribution, seed=args.seed)
+        print(f'{args.employees} empleados x {args.tasks} tareas ({args.distribution}, {args.backend}) '
+              f'generados en {time.perf_counter() - start:.1f} s\n')
+        print(f"{'etapa':<22} {'elementos':>9} {'tiempo':>11} {'ritmo':>14} {'memoria':>12}")
+        total_tasks = args.employees * args.tasks
+
+        results.append(measure('load_employees', lambda: storage.load_employees, args.employees))
+        results.append(measure('load_tasks', lambda: lambda: [TaskManager(name, storage) for name in employees],
+                               total_tasks))
+
+        digest = not args.no_digest
+        reminder_run = prepare_reminders(storage, employees, digest)
+        results.append(measure('prepare', lambda: lambda: prepare_reminders(storage, employees, digest),
+                               args.employees))
+        if args.scan_workers > 1:
+            scan = ShardedScan(args.scan_workers)
+            results.append(measure(f'prepare[{args.scan_workers} procesos]',
+                                   lambda: lambda: prepare_reminders(storage, employees, digest, scan=scan),
+                                   args.employees))
+
+        rng = random.Random(args.seed)
+        today = date.today().toordinal()
+        counter = iter(range(1_000_000))
+
+        def insert_setup():
+            # Cada pasada usa un empleado nuevo con las tareas de uno ya existente
+            name = f'bench_insert_{next(counter)}'
+            storage.save_tasks(name, storage.load_tasks(next(iter(employees))))
+            task_manager = TaskManager(name, storage)
+            tasks = [Task(f'Nueva {i}', rng.randint(1, 3), today + rng.randint(-30, 60)) for i in range(args.inserts)]
+            return lambda: [task_manager.insert_task(task) for task in tasks]
+
+        results.append(measure('insert_task', insert_setup, args.inserts))
+
+        # Los correos de la ventana, repetidos o inventados hasta llegar a --sends
+        messages = reminder_run.messages or [('empleado@example.com', 'Recordatorio de prueba')]
+        messages = [messages[i % len(messages)] for i in range(args.sends)]
+        config = {'from_email': 'bench@example.com', 'password': '', 'smtp_server': '127.0.0.1',
+                  'smtp_port': sink.port, 'starttls': False,
+                  'workers': args.workers, 'max_retries': 0, 'digest': digest}
+        notifier = EmailNotifier(config)
+
+        def send_one_by_one():
+            with contextlib.redirect_stdout(io.StringIO()):  # send_email escribe una línea por correo
+                for to_email, message in messages:
+                    notifier.send_email(to_email, message)
+
+        results.append(measure('send_email', lambda: send_one_by_one, len(messages)))
+        service = ReminderService(EmployeeManager(storage=storage), notifier)
+        results.append(measure(f'dispatch[{args.workers} hilos]', lambda: lambda: service.send_messages(messages),
+                               len(messages)))
+        storage.close()
+        print(f'\nEl servidor SMTP local ha recibido {sink.received} correos')
+
+    if args.json:
+        report = {'params': {key: value for key, value in vars(args).items() if key != 'json'}, 'stages': results}
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'Informe guardado en {args.json}')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mide cada etapa del recordatorio con datos sintéticos')
+    parser.add_argument('--employees', type=int, default=2000, help='Número de empleados')
+    parser.add_argument('--tasks', type=int, default=20, help='Tareas por empleado')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform',
+                        help='Reparto de las fechas de vencimiento')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json', help='Tipo de almacenamiento')
+    parser.add_argument('--inserts', type=int, default=200, help='Tareas que se añaden una a una')
+    parser.add_argument('--sends', type=int, default=500, help='Correos que se envían al servidor local')
+    parser.add_argument('--workers', type=int, default=4, help='Hilos del dispatcher')
+    parser.add_argument('--scan-workers', type=int, default=0, help='Procesos para leer los .json en paralelo')
+    parser.add_argument('--no-digest', action='store_true', help='Un correo por tarea en lugar de uno por empleado')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla del conjunto de datos')
+    parser.add_argument('--json', help='Guarda los resultados en este archivo')
+    run(parser.parse_args())
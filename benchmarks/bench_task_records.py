@@ -0,0 +1,79 @@
+"""Compara las tareas como diccionarios con fechas en texto frente a registros Task.
+
+Uso:
+    python benchmarks/bench_task_records.py [número de tareas]
+
+Mide con las mismas tareas (100.000 por defecto) lo que cuesta ordenar la
+lista por (fecha, prioridad) y filtrar las pendientes que vencen mañana,
+volviendo a interpretar la fecha con strptime (como antes) o usando los
+registros Task convertidos una sola vez al cargar.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from models import Task  # noqa: E402
+
+
+def make_tasks(n):
+    """Genera n tareas con el formato de los archivos .json"""
+    today = date.today()
+    return [{
+        'task': f'Tarea {i}',
+        'priority': str(random.randint(1, 3)),
+        'due_date': (today + timedelta(days=random.randint(-365, 365))).strftime('%d-%m-%y'),
+        'status': random.choice(('Pendiente', 'Completada')),
+    } for i in range(n)]
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f'{label:<45} {time.perf_counter() - start:8.3f} s')
+    return result
+
+
+def peak_memory(func):
+    """Memoria máxima (en MB) que reserva la función"""
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak / 1e6
+
+
+def run(n):
+    raw = make_tasks(n)
+    now = datetime.now()
+    tomorrow = (now + timedelta(days=1)).date()
+    print(f'{n} tareas\n')
+
+    print('Diccionarios con la fecha en texto (antes)')
+    dicts, dict_mb = peak_memory(lambda: [dict(data) for data in raw])
+    timed('  ordenar por (fecha, prioridad)', lambda: sorted(
+        dicts, key=lambda t: (datetime.strptime(t['due_date'], '%d-%m-%y'), int(t['priority']))))
+    timed('  filtrar pendientes que vencen mañana', lambda: [
+        t for t in dicts
+        if t['status'] == 'Pendiente'
+        and timedelta(0) <= datetime.strptime(t['due_date'], '%d-%m-%y') - now <= timedelta(days=1)])
+
+    print('\nRegistros Task (ahora)')
+    tasks = timed('  convertir una vez al cargar', lambda: [Task.from_dict(data) for data in raw])
+    timed('  ordenar por (fecha, prioridad)', lambda: sorted(tasks, key=lambda t: t.sort_key))
+    target = tomorrow.toordinal()
+    timed('  filtrar pendientes que vencen mañana', lambda: [
+        t for t in tasks if t.status == 'Pendiente' and t.due_ordinal == target])
+    timed('  volver a serializar al formato .json', lambda: [t.to_dict() for t in tasks])
+
+    # La memoria se mide aparte porque tracemalloc ralentiza mucho las conversiones
+    _, task_mb = peak_memory(lambda: [Task.from_dict(data) for data in raw])
+    print(f'\nMemoria: diccionarios {dict_mb:.1f} MB, registros Task {task_mb:.1f} MB')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,91 @@
+"""Genera un conjunto de empleados y tareas de prueba.
+
+Uso:
+    python benchmarks/generate_dataset.py CARPETA [--employees 1000] [--tasks 20]
+        [--distribution uniform|normal|near] [--spread 60] [--completed 0.3]
+        [--backend json|sqlite] [--seed 1]
+
+Las fechas de vencimiento se reparten alrededor de hoy según la distribución:
+- uniform: igual de probable cualquier día entre -spread y +spread.
+- normal: concentradas en hoy con desviación spread / 3.
+- near: casi todas en los próximos días (exponencial de media spread / 10),
+  el peor caso para el recordatorio porque muchas caen en la ventana de 24 h.
+
+Los archivos se escriben con el mismo almacenamiento que usa la aplicación,
+así que tienen exactamente el formato de siempre.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from models import Task  # noqa: E402
+from storage import JsonStorage, SQLiteStorage  # noqa: E402
+
+DISTRIBUTIONS = ('uniform', 'normal', 'near')
+
+
+def due_offsets(rng, distribution, spread):
+    """Devuelve una función que genera días de diferencia respecto a hoy"""
+    if distribution == 'uniform':
+        return lambda: rng.randint(-spread, spread)
+    if distribution == 'normal':
+        return lambda: round(rng.gauss(0, spread / 3))
+    if distribution == 'near':
+        return lambda: min(spread, int(rng.expovariate(10 / spread)))
+    raise ValueError(f'Distribución desconocida: {distribution}')
+
+
+def make_tasks(rng, count, offset, completed=0.3, today=None):
+    """Genera `count` tareas con fechas según `offset`"""
+    today = (today or date.today()).toordinal()
+    return [Task(f'Tarea {i}', rng.randint(1, 3), today + offset(),
+                 'Completada' if rng.random() < completed else 'Pendiente')
+            for i in range(count)]
+
+
+def open_target(backend, directory):
+    """Crea el almacenamiento de destino dentro de la carpeta"""
+    os.makedirs(directory, exist_ok=True)
+    if backend == 'sqlite':
+        return SQLiteStorage(os.path.join(directory, 'tareas.db'))
+    return JsonStorage(os.path.join(directory, 'info_empleados.json'), directory)
+
+
+def generate(storage, employees=1000, tasks_per_employee=20, distribution='uniform', spread=60,
+             completed=0.3, seed=1):
+    """Llena el almacenamiento con empleados y tareas sintéticos"""
+    #OUTPUT
+    #-Devuelve el diccionario de empleados generado
+    rng = random.Random(seed)
+    offset = due_offsets(rng, distribution, spread)
+    names = {f'empleado{i:06d}': f'empleado{i:06d}@example.com' for i in range(employees)}
+    storage.save_employees(names)
+    for name in names:
+        tasks = sorted(make_tasks(rng, tasks_per_employee, offset, completed), key=lambda task: task.sort_key)
+        storage.save_tasks(name, tasks)
+    if isinstance(storage, JsonStorage):
+        storage.rebuild_due_index()
+    return names
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera empleados y tareas de prueba')
+    parser.add_argument('directory', help='Carpeta donde se crean los archivos')
+    parser.add_argument('--employees', type=int, default=1000, help='Número de empleados')
+    parser.add_argument('--tasks', type=int, default=20, help='Tareas por empleado')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform',
+                        help='Reparto de las fechas de vencimiento')
+    parser.add_argument('--spread', type=int, default=60, help='Días alrededor de hoy')
+    parser.add_argument('--completed', type=float, default=0.3, help='Proporción de tareas completadas')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json', help='Tipo de almacenamiento')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla para repetir el mismo conjunto')
+    args = parser.parse_args()
+
+    storage = open_target(args.backend, args.directory)
+    generate(storage, args.employees, args.tasks, args.distribution, args.spread, args.completed, args.seed)
+    storage.close()
+    print(f'Generados {args.employees} empleados con {args.tasks} tareas cada uno en {args.directory}')
@@ -0,0 +1,252 @@
+"""Importación y exportación masiva de empleados y tareas (CSV o JSONL).
+
+Los archivos se leen línea a línea y se escriben en el almacenamiento por
+lotes, así que la memoria no depende del tamaño del archivo. Las filas con
+errores se indican con su número de línea y no detienen la importación.
+
+Columnas / claves:
+- Empleados: name, email
+- Tareas: employee, task, priority, due_date (dd-mm-yy), status (opcional,
+  'Pendiente' por defecto)
+
+Uso (por defecto con el almacenamiento y las rutas de config.py):
+    python bulk_io.py import employees empleados.csv
+    python bulk_io.py import tasks tareas.jsonl --backend sqlite --db ./tareas.db
+    python bulk_io.py export tasks copia.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from models import Task, parse_due_date
+from reminders import task_sort_key
+from storage import open_storage
+from templates import check_address
+
+EMPLOYEE_FIELDS = ['name', 'email']
+TASK_FIELDS = ['employee', 'task', 'priority', 'due_date', 'status']
+STATUSES = ('Pendiente', 'Completada')
+
+
+def file_format(path):
+    """Deduce el formato ('csv' o 'jsonl') por la extensión del archivo"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f'Formato no soportado: {path} (usar .csv o .jsonl)')
+
+
+def read_rows(file, fmt):
+    """Recorre las filas del archivo sin cargarlo entero"""
+    #OUTPUT
+    #-Genera pares (número de línea, fila); la fila es un diccionario o un mensaje de error
+    if fmt == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, f'JSON no válido: {e.msg}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, 'Se esperaba un objeto JSON'
+            continue
+        yield line_number, row
+
+
+def text_field(row, key, default=''):
+    """Valor de texto de una columna sin espacios a los lados"""
+    #OUTPUT
+    #-Devuelve default si falta o está vacío; lanza ValueError si no es texto (p. ej. un número en JSONL)
+    value = row.get(key)
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f'El campo {key!r} debe ser texto: {value!r}')
+    return value.strip()
+
+
+def parse_employee(row):
+    """Valida una fila de empleado"""
+    #OUTPUT
+    #-Devuelve (nombre, correo) o lanza ValueError con el motivo
+    name = text_field(row, 'name').lower()
+    email = text_field(row, 'email')
+    if not name:
+        raise ValueError('Falta el nombre del empleado')
+    if '@' not in email:
+        raise ValueError(f'Correo no válido: {email!r}')
+    check_address(email)
+    return name, email
+
+
+def parse_task(row, employees):
+    """Valida una fila de tarea"""
+    #OUTPUT
+    #-Devuelve (empleado, Task) o lanza ValueError con el motivo
+    employee = text_field(row, 'employee').lower()
+    if employee not in employees:
+        raise ValueError(f'Empleado desconocido: {employee!r}')
+    name = text_field(row, 'task')
+    if not name:
+        raise ValueError('Falta el nombre de la tarea')
+    try:
+        priority = int(row.get('priority'))
+    except (TypeError, ValueError):
+        raise ValueError(f"Prioridad no válida: {row.get('priority')!r}") from None
+    if priority not in (1, 2, 3):
+        raise ValueError(f'Prioridad no válida: {priority} (1, 2 o 3)')
+    try:
+        due_ordinal = parse_due_date(str(row.get('due_date') or ''))
+    except ValueError:
+        raise ValueError(f"Fecha no válida: {row.get('due_date')!r} (dd-mm-yy)") from None
+    status = text_field(row, 'status', 'Pendiente')
+    if status not in STATUSES:
+        raise ValueError(f'Estado no válido: {status!r}')
+    return employee, Task(name, priority, due_ordinal, status)
+
+
+def print_error(line_number, message):
+    """Muestra el error de una línea por la salida de errores"""
+    print(f'Línea {line_number}: {message}', file=sys.stderr)
+
+
+def import_employees(path, storage, batch_size=1000, on_error=print_error):
+    """Importa empleados de un archivo CSV o JSONL"""
+    #OUTPUT
+    #-Devuelve el número de empleados importados y de filas con errores
+    imported = failed = 0
+    batch = {}
+    with open(path, newline='', encoding='utf-8') as file:
+        for line_number, row in read_rows(file, file_format(path)):
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                name, email = parse_employee(row)
+            except ValueError as e:
+                failed += 1
+                on_error(line_number, str(e))
+                continue
+            batch[name] = email
+            if len(batch) >= batch_size:
+                storage.merge_employees(batch)
+                imported += len(batch)
+                batch = {}
+    if batch:
+        storage.merge_employees(batch)
+        imported += len(batch)
+    return imported, failed
+
+
+def import_tasks(path, storage, batch_size=1000, on_error=print_error):
+    """Importa tareas de un archivo CSV o JSONL"""
+    #OUTPUT
+    #-Devuelve el número de tareas importadas y de filas con errores
+    employees = storage.load_employees()
+    imported = failed = 0
+    batch = {}
+    pending = 0
+
+    def flush():
+        # Una sola escritura por empleado y lote
+        for employee, tasks in batch.items():
+            storage.merge_tasks(employee, sorted(tasks, key=task_sort_key))
+
+    with open(path, newline='', encoding='utf-8') as file:
+        for line_number, row in read_rows(file, file_format(path)):
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                employee, task = parse_task(row, employees)
+            except ValueError as e:
+                failed += 1
+                on_error(line_number, str(e))
+                continue
+            batch.setdefault(employee, []).append(task)
+            pending += 1
+            if pending >= batch_size:
+                flush()
+                imported += pending
+                batch, pending = {}, 0
+    flush()
+    imported += pending
+    return imported, failed
+
+
+def export_employees(path, storage):
+    """Exporta los empleados a un archivo CSV o JSONL"""
+    #OUTPUT
+    #-Devuelve el número de empleados exportados
+    fmt = file_format(path)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file) if fmt == 'csv' else None
+        if writer:
+            writer.writerow(EMPLOYEE_FIELDS)
+        for name, email in storage.load_employees().items():
+            if writer:
+                writer.writerow([name, email])
+            else:
+                file.write(json.dumps({'name': name, 'email': email}, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def export_tasks(path, storage):
+    """Exporta las tareas de todos los empleados a un archivo CSV o JSONL"""
+    #OUTPUT
+    #-Devuelve el número de tareas exportadas
+    fmt = file_format(path)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file) if fmt == 'csv' else None
+        if writer:
+            writer.writerow(TASK_FIELDS)
+        # Se carga un empleado cada vez
+        for employee in storage.load_employees():
+            for task in storage.load_tasks(employee):
+                if writer:
+                    writer.writerow([employee, task.name, task.priority, task.due_str, task.status])
+                else:
+                    row = {'employee': employee, **task.to_dict()}
+                    row.pop('id', None)
+                    file.write(json.dumps(row, ensure_ascii=False) + '\n')
+                count += 1
+    return count
+
+
+if __name__ == '__main__':
+    import config
+
+    parser = argparse.ArgumentParser(description='Importación y exportación masiva de empleados y tareas')
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('kind', choices=['employees', 'tasks'])
+    parser.add_argument('path', help='Archivo .csv o .jsonl')
+    parser.add_argument('--backend', default=config.STORAGE_BACKEND, choices=['json', 'sqlite'],
+                        help='Tipo de almacenamiento')
+    parser.add_argument('--employees', default=config.EMPLOYEE_FILE, help='Archivo .json de empleados')
+    parser.add_argument('--tasks-dir', default=config.TASKS_DIR, help='Carpeta con los archivos .json de tareas')
+    parser.add_argument('--db', default=config.DATABASE_FILE, help='Base de datos SQLite')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Filas que se escriben de una vez')
+    args = parser.parse_args()
+
+    storage = open_storage(args.backend, args.employees, args.db, args.tasks_dir, config.COMPACT_JSON,
+                           config.JOURNAL_LIMIT)
+    if args.action == 'import':
+        importer = import_employees if args.kind == 'employees' else import_tasks
+        imported, failed = importer(args.path, storage, args.batch_size)
+        print(f'Importadas {imported} filas, {failed} con errores')
+    else:
+        exporter = export_employees if args.kind == 'employees' else export_tasks
+        print(f'Exportadas {exporter(args.path, storage)} filas a {args.path}')
+    storage.close()
+    sys.exit(1 if args.action == 'import' and failed else 0)
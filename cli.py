@@ -0,0 +1,180 @@
+"""Gestión de empleados y tareas desde la línea de comandos, sin interfaz gráfica.
+
+Uso:
+    python cli.py add-employee juanp juan@empresa.com
+    python cli.py add-task juanp "Informe mensual" 1 25-10-26
+    python cli.py complete juanp 2
+    python cli.py delete juanp 2
+    python cli.py list              # empleados
+    python cli.py list juanp        # tareas de un empleado
+    python cli.py remind [--dry-run] [--force] [--metrics-json informe.json] [--prometheus metricas.prom]
+
+Cada orden importa solo lo que necesita para que el arranque sea inmediato.
+Nunca se carga PyQt5, así que funciona en servidores sin pantalla.
+"""
+import argparse
+import sys
+
+
+def add_employee(args):
+    """Añade un empleado"""
+    from core import EmployeeManager
+    manager = EmployeeManager()
+    manager.add_employee(args.name, args.email)
+    manager.save_employees()
+    print(f'Empleado {args.name.lower()} añadido')
+    return 0
+
+
+def _task_manager(employee):
+    """Devuelve el TaskManager del empleado o None si no existe"""
+    from core import EmployeeManager, TaskManager
+    employee_manager = EmployeeManager()
+    if employee not in employee_manager.employees:
+        print(f'El empleado {employee} no está añadido a la lista principal.', file=sys.stderr)
+        return None
+    return TaskManager(employee, employee_manager.storage)
+
+
+def add_task(args):
+    """Añade una tarea a un empleado"""
+    from models import Task, parse_due_date
+    try:
+        task = Task(args.task, int(args.priority), parse_due_date(args.due_date))
+    except ValueError:
+        print('Prioridad o fecha no válida (dd-mm-yy).', file=sys.stderr)
+        return 1
+    task_manager = _task_manager(args.employee)
+    if task_manager is None:
+        return 1
+    task_manager.insert_task(task)
+    task_manager.save_tasks()
+    print(f"Tarea '{task.name}' añadida a {args.employee}")
+    return 0
+
+
+def complete_task(args):
+    """Marca una tarea como completada"""
+    task_manager = _task_manager(args.employee)
+    if task_manager is None:
+        return 1
+    try:
+        task = task_manager.complete_task(args.number)
+    except IndexError as e:
+        print(e, file=sys.stderr)
+        return 1
+    task_manager.save_tasks()
+    print(f"Tarea '{task.name}' completada")
+    return 0
+
+
+def delete_task(args):
+    """Elimina una tarea"""
+    task_manager = _task_manager(args.employee)
+    if task_manager is None:
+        return 1
+    try:
+        task = task_manager.delete_task(args.number)
+    except IndexError as e:
+        print(e, file=sys.stderr)
+        return 1
+    task_manager.save_tasks()
+    print(f"Tarea '{task.name}' eliminada")
+    return 0
+
+
+def list_items(args):
+    """Lista los empleados o las tareas de un empleado"""
+    if args.employee is None:
+        from core import EmployeeManager
+        lines = EmployeeManager().employee_lines()
+    else:
+        task_manager = _task_manager(args.employee)
+        if task_manager is None:
+            return 1
+        lines = task_manager.task_lines()
+    for line in lines:
+        print(line)
+    return 0
+
+
+def remind(args):
+    """Envía los recordatorios de las tareas según las políticas de config.py"""
+    import config
+    import metrics
+    from core import EmployeeManager, ReminderService
+    from ledger import NotificationLedger
+    from notifier import EmailNotifier
+    report_file = args.metrics_json or config.METRICS_REPORT
+    prometheus_file = args.prometheus or config.METRICS_PROMETHEUS
+    if report_file or prometheus_file:
+        metrics.enable()
+    # Con --force se ignora el registro y se vuelve a avisar de todo lo que vence
+    ledger = None if args.force else NotificationLedger(config.LEDGER_FILE)
+    service = ReminderService(EmployeeManager(), EmailNotifier(config.EMAIL_CONFIG), ledger)
+    if args.dry_run:
+        for email, message in service.collect_messages():
+            print(f'--- {email}\n{message}')
+        return 0
+    results = service.check_and_notify()
+    failed = 0
+    for result in results:
+        if result.success:
+            print(f'Correo enviado a {result.to_email}')
+        else:
+            failed += 1
+            print(f'Error al enviar correo a {result.to_email}: {result.error}', file=sys.stderr)
+    print(f'Se han enviado {len(results) - failed} de {len(results)} notificaciones.')
+    if report_file:
+        metrics.write_json(report_file)
+    if prometheus_file:
+        metrics.write_prometheus(prometheus_file)
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Gestor de tareas automatizado (línea de comandos)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    command = subparsers.add_parser('add-employee', help='Añade un empleado')
+    command.add_argument('name', help='Nombre del usuario junto con la primera letra de los apellidos')
+    command.add_argument('email', help='Correo del usuario')
+    command.set_defaults(func=add_employee)
+
+    command = subparsers.add_parser('add-task', help='Añade una tarea a un empleado')
+    command.add_argument('employee')
+    command.add_argument('task', help='Nombre de la tarea')
+    command.add_argument('priority', help='1.Alta, 2.Media, 3.Baja')
+    command.add_argument('due_date', help='Fecha de vencimiento (dd-mm-yy)')
+    command.set_defaults(func=add_task)
+
+    command = subparsers.add_parser('complete', help='Marca una tarea como completada')
+    command.add_argument('employee')
+    command.add_argument('number', type=int, help='Número de la tarea en la lista')
+    command.set_defaults(func=complete_task)
+
+    command = subparsers.add_parser('delete', help='Elimina una tarea')
+    command.add_argument('employee')
+    command.add_argument('number', type=int, help='Número de la tarea en la lista')
+    command.set_defaults(func=delete_task)
+
+    command = subparsers.add_parser('list', help='Lista los empleados o las tareas de un empleado')
+    command.add_argument('employee', nargs='?')
+    command.set_defaults(func=list_items)
+
+    command = subparsers.add_parser('remind', help='Envía los recordatorios según las políticas de config.py')
+    command.add_argument('--dry-run', action='store_true', help='Muestra los correos sin enviarlos')
+    command.add_argument('--force', action='store_true', help='Envía también los recordatorios ya enviados')
+    command.add_argument('--metrics-json', help='Guarda el informe de la ejecución en este .json')
+    command.add_argument('--prometheus', help='Guarda las métricas en este archivo .prom para Prometheus')
+    command.set_defaults(func=remind)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Configuración compartida por la aplicación, el CLI y cron_email_sender.py."""
+import os
+from dotenv import load_dotenv
+
+#Cargar variables desde el archivo .env
+load_dotenv()
+
+
+# Configuración de correo
+EMAIL_CONFIG = {
+    'from_email': os.getenv('EMAIL_USER') , # RELLENAR con email que quieres que envie el correo
+    'password': os.getenv('PASS_USER'), # RELLENAR contraseña de aplicación
+    'smtp_server': 'smtp.gmail.com', # Servidor por el que se mandan los correos
+    'smtp_port': 587, # Puerto de conexión con el servidor
+    # 'subject': 'Recordatorio de tarea', # Asunto propio; sin él se usa el del idioma elegido
+    'workers': 4, # Conexiones SMTP que envían en paralelo
+    'rate_limit': 10, # Máximo de correos por segundo con esta cuenta
+    'max_retries': 3, # Reintentos ante errores temporales (4xx) del servidor
+    'digest': True, # Un único correo por empleado con todas sus tareas pendientes
+    'language': 'es', # Idioma de los correos: 'es', 'ca' o 'en'
+    'html': False, # True para añadir una versión HTML al texto del correo
+}
+
+# Ruta absoluta donde guardar el archivo .json
+EMPLOYEE_FILE = './info_empleados.json' # RELLENAR con ruta absoluta si se uiere guardar en otro sitio
+TASKS_DIR = '.' # RELLENAR con la carpeta donde guardar los archivos .json de tareas
+
+# Almacenamiento: 'json' (un archivo por empleado) o 'sqlite' (una única base de datos)
+STORAGE_BACKEND = 'json'
+DATABASE_FILE = './tareas.db' # RELLENAR con ruta absoluta si se quiere guardar en otro sitio
+COMPACT_JSON = False # True para guardar los .json sin sangría (ocupan menos y se escriben antes)
+JOURNAL_LIMIT = 100 # Cambios que se apuntan en el diario antes de reescribir el .json completo
+
+# Políticas de recordatorio (ver policies.py); todas se evalúan con una sola lectura de las tareas
+REMINDER_POLICIES = [
+    {'name': '1d', 'days_before': 1}, # Aviso cuando falta menos de 1 día para el vencimiento
+    # {'name': '7d', 'days_before': 7, 'priorities': [1]}, # Aviso una semana antes para las de prioridad alta
+    # {'name': 'vencida', 'overdue': True, 'every_days': 1, 'max_days': 30}, # Aviso diario de las tareas vencidas
+    # {'name': 'escalado', 'overdue': True, 'after_days': 1, 'priorities': [1],
+    #  'escalate_to': 'responsable@empresa.com'}, # Vencidas de prioridad alta al responsable
+]
+
+# Registro de recordatorios enviados, para no repetirlos si el envío se lanza varias veces
+LEDGER_FILE = './recordatorios.db' # RELLENAR con ruta absoluta si se quiere guardar en otro sitio
+
+# Procesos que leen los .json de tareas en paralelo al enviar los recordatorios con cron
+# (0 = usar el índice de vencimientos; útil con decenas de miles de empleados o si se editan los .json a mano)
+SCAN_WORKERS = 0
+
+# Métricas de cada ejecución del recordatorio (None = desactivadas)
+METRICS_REPORT = None # RELLENAR con la ruta del informe .json, p. ej. './metricas.json'
+METRICS_PROMETHEUS = None # RELLENAR con la ruta del archivo .prom del textfile collector de Prometheus
@@ -0,0 +1,280 @@
+"""Lógica de empleados, tareas y recordatorios sin interfaz gráfica.
+
+main.py añade encima los diálogos de PyQt5 y cli.py la expone por línea de
+comandos. Este módulo no debe importar PyQt5.
+"""
+from bisect import bisect_right
+from datetime import datetime
+import heapq
+
+import config
+import metrics
+from policies import PolicyEngine, build_plan
+from reminders import due_window, task_sort_key
+from repository import TaskRepository
+from storage import open_storage
+
+
+def default_storage():
+    """Abre el almacenamiento indicado en config.py"""
+    return open_storage(config.STORAGE_BACKEND, config.EMPLOYEE_FILE, config.DATABASE_FILE, config.TASKS_DIR,
+                        config.COMPACT_JSON, config.JOURNAL_LIMIT)
+
+
+def default_policies():
+    """Políticas de recordatorio indicadas en config.py"""
+    return PolicyEngine.from_config(config.REMINDER_POLICIES)
+
+
+class ReminderRun:
+    """Correos preparados en una ejecución del recordatorio."""
+
+    def __init__(self, plan, run_at, ledger=None, oldest_due=None, policies=None):
+        self.plan = plan  # Lista de (correo, mensaje, [(empleado, tarea, aviso)])
+        self.run_at = run_at
+        self.ledger = ledger
+        self.policies = policies  # Huella de las políticas usadas (PolicyEngine.fingerprint)
+        # Los registros de tareas que vencieron antes ya no pueden volver a avisarse
+        self.oldest_due = oldest_due or due_window(run_at)[0]
+
+    @property
+    def messages(self):
+        """Lista de (correo, mensaje) para el dispatcher"""
+        return [(email, message) for email, message, _ in self.plan]
+
+    def finish(self, results):
+        """Apunta en el registro las tareas cuyos correos se han enviado"""
+        if self.ledger is None:
+            return
+        sent = [item for (_, _, items), result in zip(self.plan, results) if result.success for item in items]
+        self.ledger.record(sent, self.run_at)
+        # Si algo ha fallado la marca no avanza y la próxima ejecución vuelve a revisar la ventana
+        if all(result.success for result in results):
+            self.ledger.set_last_run(self.run_at, self.policies)
+        self.ledger.prune(self.oldest_due)
+
+
+def prepare_reminders(storage, employees, digest=True, current_date=None, ledger=None, scan=None, template=None,
+                      policies=None):
+    """Prepara los correos de las tareas pendientes según las políticas de recordatorio"""
+    #INPUT
+    #-scan: función opcional (storage, primera fecha, última fecha) que sustituye a storage.iter_due_tasks
+    #-policies: PolicyEngine; por defecto las políticas de config.py
+    #OUTPUT
+    #-Devuelve un ReminderRun; con ledger solo incluye los avisos que aún no se han enviado
+    with metrics.timer('prepare_seconds'):
+        return _prepare_reminders(storage, employees, digest, current_date, ledger, scan, template,
+                                  policies or default_policies())
+
+
+def _prepare_reminders(storage, employees, digest, current_date, ledger, scan, template, policies):
+    run_at = current_date or datetime.now()
+    since = None
+    if ledger is not None:
+        last_run = ledger.last_run()
+        changed = storage.last_modified()
+        if (last_run is not None and changed is not None and changed <= last_run
+                and ledger.last_run_policies() == policies.fingerprint()):
+            # Nada ha cambiado desde la última ejecución (ni las tareas ni las políticas): solo
+            # hay que mirar los días que han entrado en las ventanas desde entonces
+            since = last_run
+    windows = policies.windows(run_at, since)
+    span = policies.span(windows)
+    matches = []
+    if span is not None:
+        # Una sola lectura para todas las políticas
+        pairs = scan(storage, *span) if scan else storage.iter_due_tasks(*span)
+        matches = list(policies.match(pairs, windows, run_at, ledger))
+
+    plan = build_plan(matches, employees, digest, template)
+    metrics.inc('reminders_matched', len(matches))
+    metrics.inc('messages_prepared', len(plan))
+    return ReminderRun(plan, run_at, ledger, policies.oldest_due(run_at), policies.fingerprint())
+
+
+class EmployeeManager:
+    """Gestión de empleados."""
+
+    def __init__(self, employee_file=None, storage=None):
+        self.employee_file = employee_file or config.EMPLOYEE_FILE
+        self.storage = storage or open_storage(config.STORAGE_BACKEND, self.employee_file,
+                                               config.DATABASE_FILE, config.TASKS_DIR,
+                                               config.COMPACT_JSON, config.JOURNAL_LIMIT)
+        self.employees = self.load_employees()
+
+    def load_employees(self):
+        """Abre el archivo.json donde se encuentran los empleados y sus correos"""
+        #OUTPUT
+        #-Devuelve un diccionario con los empleados y sus correos
+        return self.storage.load_employees()
+
+    def save_employees(self):
+        """Guarda el archivo con los empleados"""
+        self.storage.sync_employees(self.employees)
+
+    def add_employee(self, username, email):
+        """Añade un empleado (el nombre se guarda en minúsculas)"""
+        self.employees[username.lower()] = email
+        self.storage.add_employee(username.lower(), email)
+
+    def employee_lines(self):
+        """Texto de la lista de empleados, una línea por empleado"""
+        return [f"{i + 1}. {name} - {email}" for i, (name, email) in enumerate(self.employees.items())]
+
+    def iter_employees(self, text=None, reverse=False):
+        """Recorre los empleados cuyo nombre o correo contiene el texto, sin copiar la lista"""
+        #OUTPUT
+        #-Genera tuplas (número empezando en 1, nombre, correo)
+        text = text.lower() if text else None
+        if reverse:
+            items = zip(range(len(self.employees), 0, -1), reversed(self.employees.items()))
+        else:
+            items = enumerate(self.employees.items(), start=1)
+        for number, (name, email) in items:
+            if text is None or text in name or text in email.lower():
+                yield number, name, email
+
+
+class TaskManager:
+    """Gestión de tareas."""
+
+    def __init__(self, employee_name, storage=None, repository=None):
+        #INPUT
+        #-repository: TaskRepository compartido; así todas las ventanas usan la misma lista de tareas
+        self.employee_name = employee_name
+        if repository is None:
+            repository = TaskRepository(storage or default_storage())
+        self.repository = repository
+        self.storage = self.repository.storage
+        self.repository.get(employee_name)
+
+    @property
+    def tasks(self):
+        """Lista de Task ordenada por fecha y prioridad (se relee solo si ha cambiado)"""
+        return self.repository.get(self.employee_name).tasks
+
+    def load_tasks(self):
+        """Vuelve a leer las tareas del almacenamiento"""
+        #OUTPUT
+        #-Devuelve una lista de Task ordenada por fecha y prioridad
+        self.repository.invalidate(self.employee_name)
+        return self.tasks
+
+    def save_tasks(self):
+        """Guarda las tareas en el archivo.json"""
+        self.storage.sync_tasks(self.employee_name, self.tasks)
+        self.repository.saved(self.employee_name)
+
+    def insert_task(self, task):
+        """Guarda una tarea y la coloca en su sitio de la lista sin reordenarla"""
+        entry = self.repository.get(self.employee_name)
+        self.storage.add_task(self.employee_name, task)
+        key = task.sort_key
+        # bisect_right: con la misma fecha y prioridad va detrás de las que ya había
+        index = bisect_right(entry.keys, key)
+        entry.keys.insert(index, key)
+        entry.tasks.insert(index, task)
+        self.repository.saved(self.employee_name)
+
+    def add_tasks_bulk(self, tasks):
+        """Añade muchas tareas de golpe mezclándolas con la lista en una sola pasada"""
+        #INPUT
+        #-tasks: lista de Task; si ya viene ordenada por fecha y prioridad no se reordena
+        tasks = sorted(tasks, key=task_sort_key)
+        if not tasks:
+            return
+        entry = self.repository.get(self.employee_name)
+        self.storage.add_tasks(self.employee_name, tasks)
+        entry.tasks[:] = heapq.merge(entry.tasks, tasks, key=task_sort_key)
+        entry.keys[:] = [task.sort_key for task in entry.tasks]
+        self.repository.saved(self.employee_name)
+
+    def complete_task(self, task_index):
+        """Marca como completada la tarea con ese número (empezando en 1)"""
+        tasks = self.tasks
+        if not 0 < task_index <= len(tasks):
+            raise IndexError('Número introducido no válido.')
+        task = tasks[task_index - 1]
+        task.status = 'Completada'
+        self.storage.update_task(self.employee_name, task)
+        self.repository.saved(self.employee_name)
+        return task
+
+    def delete_task(self, task_index):
+        """Elimina la tarea con ese número (empezando en 1)"""
+        entry = self.repository.get(self.employee_name)
+        if not 0 < task_index <= len(entry.tasks):
+            raise IndexError('Número introducido no válido.')
+        task = entry.tasks.pop(task_index - 1)
+        del entry.keys[task_index - 1]
+        self.storage.delete_task(self.employee_name, task)
+        self.repository.saved(self.employee_name)
+        return task
+
+    def iter_tasks(self, status=None, priority=None, first_date=None, last_date=None, reverse=False):
+        """Recorre las tareas que cumplen los filtros, sin copiar la lista"""
+        #INPUT
+        #-first_date, last_date: rango de fechas de vencimiento (incluidas); None para no limitar
+        #OUTPUT
+        #-Genera pares (número en la lista empezando en 1, Task), por fecha y prioridad o al revés
+        first = first_date.toordinal() if first_date else None
+        last = last_date.toordinal() if last_date else None
+        tasks = self.tasks
+        numbers = range(len(tasks), 0, -1) if reverse else range(1, len(tasks) + 1)
+        for number in numbers:
+            task = tasks[number - 1]
+            if status is not None and task.status != status:
+                continue
+            if priority is not None and task.priority != priority:
+                continue
+            if first is not None and task.due_ordinal < first:
+                continue
+            if last is not None and task.due_ordinal > last:
+                continue
+            yield number, task
+
+    def task_lines(self):
+        """Texto de la lista de tareas, una línea por tarea"""
+        return [f"{i + 1}. {task.name} | Prioridad: {task.priority} | {task.due_str} | Estado: {task.status}"
+                for i, task in enumerate(self.tasks)]
+
+
+class ReminderService:
+    """Servicio para verificar y enviar recordatorios de tareas."""
+
+    def __init__(self, employee_manager, email_notifier, ledger=None, policies=None):
+        self.employee_manager = employee_manager
+        self.email_notifier = email_notifier
+        self.ledger = ledger  # NotificationLedger opcional para no repetir envíos
+        self.policies = policies or default_policies()
+
+    def prepare(self, current_date=None, storage=None):
+        """Prepara los correos de la ejecución sin enviarlos"""
+        #INPUT
+        #-storage: almacenamiento alternativo, p. ej. una conexión abierta en otro hilo
+        return prepare_reminders(storage or self.employee_manager.storage, dict(self.employee_manager.employees),
+                                 self.email_notifier.config.get('digest', False), current_date, self.ledger,
+                                 template=self.email_notifier.template, policies=self.policies)
+
+    def collect_messages(self, current_date=None, storage=None):
+        """Prepara los correos de las tareas pendientes según las políticas de recordatorio"""
+        return self.prepare(current_date, storage).messages
+
+    def send_messages(self, messages, on_result=None, cancel_event=None):
+        """Envía los correos ya preparados"""
+        #OUTPUT
+        #-Devuelve un SendResult por cada correo
+        from dispatcher import ReminderDispatcher  # smtplib solo se carga si se envía algo
+
+        # Los correos se reparten entre varias conexiones SMTP reutilizadas
+        return ReminderDispatcher.from_config(self.email_notifier).dispatch(messages, on_result, cancel_event)
+
+    def check_and_notify(self, on_result=None, cancel_event=None):
+        """Repasa las tareas pendientes de cada usuario y envía los avisos de las políticas de recordatorio"""
+        #OUTPUT
+        #-Devuelve un SendResult por cada correo
+        with metrics.timer('run_seconds'):
+            run = self.prepare()
+            results = self.send_messages(run.messages, on_result, cancel_event)
+            run.finish(results)
+        return results
@@ -1,91 +1,74 @@
-from datetime import datetime, timedelta
-import json
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-import os
-from dotenv import load_dotenv
+import argparse
 
-#Cargar variables desde el archivo .env
-load_dotenv()
+from config import EMAIL_CONFIG, EMPLOYEE_FILE, STORAGE_BACKEND, DATABASE_FILE, TASKS_DIR, LEDGER_FILE, COMPACT_JSON, JOURNAL_LIMIT
+from config import SCAN_WORKERS, METRICS_REPORT, METRICS_PROMETHEUS
+from core import prepare_reminders
+from ledger import NotificationLedger
+from notifier import EmailNotifier
+from dispatcher import ReminderDispatcher
+import metrics
+from sharded_scan import ShardedScan
+from storage import open_storage
 
+# La configuración (correo, rutas y almacenamiento) está en config.py
+employee_file = EMPLOYEE_FILE
 
-# Configuración de correo
-EMAIL_CONFIG = {
-<<<<<<< HEAD
-    'from_email': ' correo del emisor ', # RELLENAR
-    'password': ' contraseña de aplicación (IMPORTANTE) del correo ', # RELLENAR
-    'smtp_server': 'smtp.gmail.com',
-    'smtp_port': 587,
-=======
-    'from_email': os.getenv('EMAIL_USER') , # RELLENAR con email que quieres que envie el correo
-    'password': os.getenv('PASS_USER'), # RELLENAR contraseña de aplicación
-    'smtp_server': 'smtp.gmail.com', # Servidor por el que se mandan los correos
-    'smtp_port': 587, # Puerto de conexión con el servidor
->>>>>>> bc893c5 (Creando archivo .env)
-    'subject': 'Recordatorio de tarea',
-}
+def get_storage():
+    """Abre el almacenamiento configurado"""
+    return open_storage(STORAGE_BACKEND, employee_file, DATABASE_FILE, TASKS_DIR, COMPACT_JSON, JOURNAL_LIMIT)
 
-# Ruta absoluta donde guardar el archivo .json
-employee_file = './info_empleados.json' # RELLENAR con ruta absoluta donnde estan los archivos .json
-
-class EmailNotifier:
-    """Clase para manejar notificaciones por correo."""
-    
-    def __init__(self, config):
-        self.config = config
-    
-    def send_email(self, to_email, message):
-        """Envia el email al usuario correspondiente"""
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.config['from_email']
-            msg["To"] = to_email
-            msg['Subject'] = self.config['subject']
-            msg.attach(MIMEText(message, 'plain'))
-            
-            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
-            server.starttls()
-            server.login(self.config['from_email'], self.config['password'])
-            server.send_message(msg)
-            server.quit()
-            print(f'Correo enviado a {to_email}')
-        except Exception as e:
-            print(f'Error al enviar correo: {e}')
-
-def load_employees(employee_file):
+def load_employees(employee_file, storage=None):
         """Abre el archivo.json donde se encuentran los empleados y sus correos"""
-        try:
-            with open(employee_file, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            with open(employee_file, 'w') as file:
-                json.dump({}, file)
-            return {}
+        storage = storage or open_storage(STORAGE_BACKEND, employee_file, DATABASE_FILE, TASKS_DIR,
+                                          COMPACT_JSON, JOURNAL_LIMIT)
+        return storage.load_employees()
 
-def load_tasks(employee):
+def load_tasks(employee, storage=None):
         """Abre el archivo.json donde se encuentran las tareas"""
-        task_file = f'./{employee}.json' # RELLENAR con ruta absoluta donnde estan los archivos .json
-        try:
-            with open(task_file, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            with open(task_file, 'w') as file:
-                json.dump([], file)
-            return []
+        storage = storage or get_storage()
+        return storage.load_tasks(employee)
     
-def check_and_notify(employees, email_notifier):
-    """Repasa todas las tareas de cada usuario, si estan pendientes y falta menos de 1 dia envia el correo"""
-    current_date = datetime.now()
-    for employee, email in employees.items():
-        tasks = load_tasks(employee)
-        for task in tasks:
-            due_date = datetime.strptime(task['due_date'], '%d-%m-%y')
-            if task['status'] == 'Pendiente' and timedelta(0) <= (due_date - current_date) <= timedelta(days=1):
-                message = (f"Hola, recuerda que la tarea '{task['task']}' vence el {task['due_date']}.")
-                email_notifier.send_email(email, message)
+def check_and_notify(employees, email_notifier, storage=None, ledger=None, scan_workers=0, policies=None):
+    """Repasa las tareas pendientes de cada usuario y envía los avisos de las políticas de recordatorio"""
+    #INPUT
+    #-ledger: NotificationLedger opcional; con él solo se envía lo que no se haya enviado ya
+    #-scan_workers: si es mayor que 1, los archivos de tareas se leen repartidos entre ese número de procesos
+    #-policies: PolicyEngine con los avisos que se envían; por defecto REMINDER_POLICIES de config.py
+    storage = storage or get_storage()
+    scan = ShardedScan(scan_workers) if scan_workers > 1 else None
+    with metrics.timer('run_seconds'):
+        run = prepare_reminders(storage, employees, email_notifier.config.get('digest', False), ledger=ledger,
+                                scan=scan, template=email_notifier.template, policies=policies)
+
+        # Los correos se reparten entre varias conexiones SMTP reutilizadas
+        results = ReminderDispatcher.from_config(email_notifier).dispatch(run.messages)
+        run.finish(results)
+    for result in results:
+        if result.success:
+            print(f'Correo enviado a {result.to_email}')
+        else:
+            print(f'Error al enviar correo a {result.to_email}: {result.error}')
+    return results
 
 
 if __name__ == '__main__':
-    employees = load_employees(employee_file)
-    check_and_notify(employees, EmailNotifier)
+    parser = argparse.ArgumentParser(description='Envía los recordatorios de las tareas según las políticas de config.py')
+    parser.add_argument('--workers', type=int, default=SCAN_WORKERS,
+                        help='Procesos que leen los archivos de tareas en paralelo (0 = usar el índice)')
+    parser.add_argument('--metrics-json', default=METRICS_REPORT, help='Guarda el informe de la ejecución en este .json')
+    parser.add_argument('--prometheus', default=METRICS_PROMETHEUS,
+                        help='Guarda las métricas en este archivo .prom para Prometheus')
+    args = parser.parse_args()
+    if args.metrics_json or args.prometheus:
+        metrics.enable()
+
+    storage = get_storage()
+    ledger = NotificationLedger(LEDGER_FILE)
+    employees = load_employees(employee_file, storage)
+    check_and_notify(employees, EmailNotifier(EMAIL_CONFIG), storage, ledger, args.workers)
+    ledger.close()
+    storage.close()
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
@@ -0,0 +1,242 @@
+"""Servicio que envía cada recordatorio justo cuando su tarea entra en la ventana de su política.
+
+En lugar de revisar todo el almacenamiento cada vez que lo lanza cron, el
+servicio mantiene empleados y tareas en memoria y solo relee los empleados
+cuyas tareas han cambiado (comprobando la versión de cada uno cada pocos
+segundos). Cada tarea pendiente se guarda en un montículo una vez por cada
+política que se le aplica (ver policies.py), ordenada por el momento en que
+hay que avisar, de modo que el bucle duerme hasta el siguiente aviso sin
+recorrer nada. Los avisos de tareas vencidas se vuelven a programar para el
+siguiente periodo al enviarse.
+
+Uso:
+    python daemon.py [--poll 30]
+"""
+import argparse
+import heapq
+import itertools
+import signal
+import threading
+from datetime import datetime, timedelta
+
+from policies import build_plan
+
+PENDING = 'Pendiente'
+
+
+def due_time(task):
+    """Vencimiento de la tarea (a las 00:00 de su fecha)"""
+    return datetime.fromordinal(task.due_ordinal)
+
+
+def reminder_time(task, policy, now):
+    """Próximo momento en que la política avisa de la tarea o None si ya no lo hará"""
+    due = due_time(task)
+    if not policy.overdue:
+        return due - timedelta(days=policy.days_before) if now <= due else None
+    start = due + timedelta(days=policy.after_days)
+    if now >= due + timedelta(days=policy.max_days + 1):
+        return None
+    if now < start:
+        return start
+    # Principio del periodo en curso: si su aviso ya se envió, pop_due lo descarta
+    return start + timedelta(days=(now - start).days // policy.every_days * policy.every_days)
+
+
+class ReminderDaemon:
+    """Mantiene las tareas en memoria y programa cada recordatorio en un montículo."""
+
+    def __init__(self, reminder_service, poll_interval=30):
+        self.service = reminder_service
+        self.storage = reminder_service.employee_manager.storage
+        self.policies = reminder_service.policies
+        self.poll_interval = poll_interval
+        self.employees = {}
+        self.tasks = {}  # Empleado -> lista de Task
+        self.versions = {}  # Empleado -> versión de sus tareas ya cargada
+        # Montículo de (hora de aviso, orden, empleado, generación, política, tarea)
+        self.heap = []
+        self.generation = {}  # Al recargar un empleado sus entradas antiguas dejan de valer
+        self.queued = {}  # Empleado -> entradas de su generación actual que siguen en el montículo
+        self.stale = 0  # Entradas del montículo de generaciones antiguas
+        self.sent = set()  # (empleado, tarea, vencimiento, aviso) ya avisados en este proceso
+        self._counter = itertools.count()
+        self.stop_event = threading.Event()
+
+    def reload(self):
+        """Relee los empleados y las tareas de los empleados que han cambiado"""
+        #OUTPUT
+        #-Devuelve el número de empleados cuyas tareas se han vuelto a cargar
+        self.employees = self.storage.load_employees()
+        self.service.employee_manager.employees = self.employees
+        versions = self.storage.task_versions()
+        for employee in list(self.tasks):
+            if employee not in self.employees:
+                self._forget(employee)
+        reloaded = 0
+        for employee in self.employees:
+            version = versions.get(employee)
+            if employee in self.versions and self.versions[employee] == version:
+                continue
+            self.versions[employee] = version
+            self.tasks[employee] = self.storage.load_tasks(employee)
+            self._schedule(employee)
+            reloaded += 1
+        if self.stale > len(self.heap) // 2:
+            self.compact()
+        return reloaded
+
+    def compact(self):
+        """Quita del montículo las entradas de generaciones antiguas"""
+        # Sin esto cada recarga dejaría en el montículo las entradas anteriores hasta su hora,
+        # que puede estar a meses vista
+        self.heap = [entry for entry in self.heap if entry[3] == self.generation.get(entry[2])]
+        heapq.heapify(self.heap)
+        self.stale = 0
+
+    def _invalidate(self, employee):
+        # Las entradas que quedan del empleado dejan de valer
+        self.stale += self.queued.pop(employee, 0)
+        self.generation[employee] = self.generation.get(employee, 0) + 1
+        return self.generation[employee]
+
+    def _forget(self, employee):
+        del self.tasks[employee]
+        self.versions.pop(employee, None)
+        self._invalidate(employee)
+
+    def _schedule(self, employee):
+        """Programa los avisos de las tareas pendientes del empleado"""
+        generation = self._invalidate(employee)
+        now = datetime.now()
+        for task in self.tasks[employee]:
+            if task.status != PENDING:
+                continue
+            for policy in self.policies.policies_for(task.priority):
+                self._push(reminder_time(task, policy, now), employee, generation, policy, task)
+
+    def _push(self, fire_at, employee, generation, policy, task):
+        if fire_at is not None:
+            heapq.heappush(self.heap, (fire_at, next(self._counter), employee, generation, policy, task))
+            self.queued[employee] = self.queued.get(employee, 0) + 1
+
+    def next_reminder(self):
+        """Hora del próximo aviso programado o None si no hay ninguno"""
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now):
+        """Saca del montículo los avisos cuyo momento ya ha llegado"""
+        #OUTPUT
+        #-Devuelve una lista de (política, aviso, empleado, tarea) sin las entradas caducadas ni las ya avisadas
+        ledger = self.service.ledger
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, _, employee, generation, policy, task = heapq.heappop(self.heap)
+            if generation != self.generation.get(employee):
+                self.stale -= 1
+                continue  # El empleado se ha recargado después de programar esta entrada
+            self.queued[employee] -= 1
+            if policy.overdue and reminder_time(task, policy, fire_at) == fire_at:
+                # El aviso del siguiente periodo (los reintentos no lo vuelven a programar)
+                self._push(reminder_time(task, policy, fire_at + timedelta(days=policy.every_days)),
+                           employee, generation, policy, task)
+            first_date, last_date = policy.window(now)
+            if not first_date <= task.due_date <= last_date:
+                continue  # La tarea ya ha salido de la ventana de la política
+            notice = policy.notice(task, now)
+            key = (employee, task.id, task.due_ordinal, notice)
+            if key in self.sent:
+                continue
+            if ledger is not None and ledger.was_sent(employee, task, notice):
+                self.sent.add(key)
+                continue
+            due.append((policy, notice, employee, task))
+        return due
+
+    def fire(self, now=None):
+        """Envía los recordatorios cuyo momento ya ha llegado"""
+        #OUTPUT
+        #-Devuelve un SendResult por cada correo enviado
+        now = now or datetime.now()
+        due = self.pop_due(now)
+        policies = {(employee, id(task), notice): policy for policy, notice, employee, task in due}
+        plan = build_plan(due, self.employees, self.service.email_notifier.config.get('digest', False),
+                          self.service.email_notifier.template)
+        if not plan:
+            return []
+        results = self.service.send_messages([(email, message) for email, message, _ in plan])
+        ledger = self.service.ledger
+        if ledger is not None:
+            # Solo se apuntan los avisos: el servicio no revisa las ventanas completas, así que no
+            # mueve la marca de la última ejecución que usan cron, cli.py y la ventana
+            ledger.record([item for (_, _, items), result in zip(plan, results) if result.success
+                           for item in items], now)
+            ledger.prune(self.policies.oldest_due(now))
+        for (_, _, items), result in zip(plan, results):
+            for employee, task, notice in items:
+                if result.success:
+                    self.sent.add((employee, task.id, task.due_ordinal, notice))
+                else:
+                    # Se reintentará en la siguiente vuelta del bucle
+                    self._push(now + timedelta(seconds=self.poll_interval), employee, self.generation[employee],
+                               policies[employee, id(task), notice], task)
+        self._prune_sent(now)
+        return results
+
+    def _prune_sent(self, now):
+        oldest = self.policies.oldest_due(now).toordinal()
+        self.sent = {key for key in self.sent if key[2] >= oldest}
+
+    def run(self, on_results=None):
+        """Bucle principal: recarga lo que cambie y duerme hasta el siguiente aviso"""
+        #INPUT
+        #-on_results: función opcional que se llama con los SendResult de cada envío
+        # La sesión SMTP se mantiene abierta entre avisos y se reconecta si el servidor la cierra
+        with self.service.email_notifier.session(size=self.service.email_notifier.config.get('workers', 1)):
+            next_poll = datetime.min
+            while not self.stop_event.is_set():
+                now = datetime.now()
+                if now >= next_poll:
+                    self.reload()
+                    next_poll = now + timedelta(seconds=self.poll_interval)
+                results = self.fire(now)
+                if results and on_results is not None:
+                    on_results(results)
+                wake = next_poll
+                next_reminder = self.next_reminder()
+                if next_reminder is not None and next_reminder < wake:
+                    wake = next_reminder
+                self.stop_event.wait(max(0.0, (wake - datetime.now()).total_seconds()))
+
+    def stop(self):
+        """Detiene el bucle principal"""
+        self.stop_event.set()
+
+
+def print_results(results):
+    """Muestra el resultado de cada correo"""
+    for result in results:
+        if result.success:
+            print(f'Correo enviado a {result.to_email}', flush=True)
+        else:
+            print(f'Error al enviar correo a {result.to_email}: {result.error}', flush=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Envía los recordatorios en el momento en que vencen')
+    parser.add_argument('--poll', type=float, default=30, help='Segundos entre comprobaciones de cambios')
+    args = parser.parse_args()
+
+    import config
+    from core import EmployeeManager, ReminderService
+    from ledger import NotificationLedger
+    from notifier import EmailNotifier
+
+    service = ReminderService(EmployeeManager(), EmailNotifier(config.EMAIL_CONFIG),
+                              NotificationLedger(config.LEDGER_FILE))
+    daemon = ReminderDaemon(service, args.poll)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    signal.signal(signal.SIGINT, lambda *_: daemon.stop())
+    daemon.run(print_results)
+    service.employee_manager.storage.close()
+    service.ledger.close()
@@ -0,0 +1,145 @@
+"""Envío concurrente de recordatorios con límite de ritmo y reintentos.
+
+Los correos se reparten entre varios hilos que comparten el pool de sesiones
+SMTP del EmailNotifier. Cada cuenta SMTP tiene su propio token bucket para no
+superar el límite del proveedor, y los errores temporales (4xx) se reintentan
+con espera exponencial.
+"""
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from notifier import SEND_ERRORS, SendResult
+
+# Error de los correos que no se llegan a enviar porque se ha cancelado el envío
+CANCELLED = 'Cancelado'
+
+
+class TokenBucket:
+    """Limita el ritmo a `rate` envíos por segundo con ráfagas de `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Un bucket por cuenta SMTP, compartido por todos los dispatchers del proceso
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def bucket_for(config):
+    """Devuelve el token bucket de la cuenta SMTP de la configuración"""
+    #OUTPUT
+    #-Devuelve None si la configuración no define 'rate_limit'
+    rate = config.get('rate_limit')
+    if not rate:
+        return None
+    account = (config['smtp_server'], config['from_email'])
+    with _buckets_lock:
+        if account not in _buckets:
+            _buckets[account] = TokenBucket(rate, config.get('burst'))
+        return _buckets[account]
+
+
+def is_transient(error):
+    """Indica si el error SMTP es temporal y merece la pena reintentar"""
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    # Desconexiones, timeouts y errores de red
+    return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+
+class ReminderDispatcher:
+    """Envía lotes de correos en paralelo con un número acotado de hilos."""
+
+    def __init__(self, email_notifier, workers=4, max_retries=3, retry_backoff=1.0):
+        self.email_notifier = email_notifier
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.bucket = bucket_for(email_notifier.config)
+        self._auth_error = None
+        self._cancel_event = None
+
+    @classmethod
+    def from_config(cls, email_notifier):
+        """Crea el dispatcher con los parámetros de la configuración de correo"""
+        config = email_notifier.config
+        return cls(email_notifier,
+                   workers=config.get('workers', 4),
+                   max_retries=config.get('max_retries', 3),
+                   retry_backoff=config.get('retry_backoff', 1.0))
+
+    def dispatch(self, messages, on_result=None, cancel_event=None):
+        """Envía una lista de (correo, mensaje) y devuelve un SendResult por mensaje"""
+        #INPUT
+        #-on_result: función opcional que se llama con cada SendResult al terminar
+        #-cancel_event: threading.Event opcional; al activarlo no se envía nada más
+        messages = list(messages)
+        results = [None] * len(messages)
+        self._auth_error = None
+        self._cancel_event = cancel_event
+
+        def send(index):
+            to_email, message = messages[index]
+            results[index] = self._send_with_retry(to_email, message)
+            if on_result is not None:
+                on_result(results[index])
+
+        with metrics.timer('dispatch_seconds'), self.email_notifier.session(size=self.workers):
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                # list() propaga cualquier excepción inesperada de los hilos
+                list(executor.map(send, range(len(messages))))
+        sent = sum(1 for result in results if result.success)
+        metrics.inc('reminders_sent', sent)
+        metrics.inc('reminders_failed', len(results) - sent)
+        return results
+
+    def _send_with_retry(self, to_email, message):
+        attempt = 0
+        while True:
+            if self._cancel_event is not None and self._cancel_event.is_set():
+                return SendResult(to_email, False, CANCELLED)
+            if self._auth_error is not None:  # No tiene sentido reintentar el login
+                return SendResult(to_email, False, self._auth_error)
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                self.email_notifier.deliver(to_email, message)
+                return SendResult(to_email, True)
+            except smtplib.SMTPAuthenticationError as e:
+                self._auth_error = str(e)
+                return SendResult(to_email, False, self._auth_error)
+            except SEND_ERRORS as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    return SendResult(to_email, False, str(e))
+            # Espera exponencial con algo de aleatoriedad para no sincronizar hilos
+            metrics.inc('smtp_retries')
+            delay = self.retry_backoff * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, self.retry_backoff))
+            attempt += 1
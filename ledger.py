@@ -0,0 +1,139 @@
+"""Registro de los recordatorios ya enviados.
+
+Guarda cada (empleado, tarea, fecha de vencimiento, aviso) notificado y la
+hora de la última ejecución, de modo que el recordatorio se puede lanzar con
+cron cada pocos minutos sin enviar nada dos veces y revisando solo lo nuevo.
+El aviso identifica la política que lo envió (ver policies.py) y la tarea se
+identifica por su id, así que dos tareas con el mismo nombre y vencimiento se
+avisan por separado.
+"""
+import sqlite3
+from datetime import datetime
+
+# Aviso con el que se guardan los registros anteriores a las políticas (el de 24 horas)
+LEGACY_NOTICE = '1d'
+
+
+class NotificationLedger:
+    """Recordatorios enviados y marca de la última ejecución en SQLite."""
+
+    # notices guarda los registros por nombre de tarea: los anteriores a los identificadores
+    # y los de tareas sin id (índices antiguos de JsonStorage)
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS task_notices (
+            employee TEXT NOT NULL,
+            task_id INTEGER NOT NULL,
+            due_date TEXT NOT NULL,
+            notice TEXT NOT NULL,
+            sent_at TEXT NOT NULL,
+            PRIMARY KEY (employee, task_id, due_date, notice)
+        );
+        CREATE TABLE IF NOT EXISTS notices (
+            employee TEXT NOT NULL,
+            task TEXT NOT NULL,
+            due_date TEXT NOT NULL,
+            notice TEXT NOT NULL,
+            sent_at TEXT NOT NULL,
+            PRIMARY KEY (employee, task, due_date, notice)
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, ledger_file):
+        self.ledger_file = ledger_file
+        # La ventana usa el registro desde el hilo que envía los recordatorios
+        self.conn = sqlite3.connect(ledger_file, check_same_thread=False)
+        self.conn.executescript(self.SCHEMA)
+        self._migrate()
+        # Solo se consultan los registros por nombre mientras quede alguno
+        self._named = self.conn.execute('SELECT 1 FROM notices LIMIT 1').fetchone() is not None
+
+    def _migrate(self):
+        # Los registros de la tabla antigua (sin aviso) pasan a la nueva con el aviso de 24 horas
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sent'").fetchone():
+            with self.conn:
+                self.conn.execute('INSERT OR IGNORE INTO notices (employee, task, due_date, notice, sent_at) '
+                                  'SELECT employee, task, due_date, ?, sent_at FROM sent', (LEGACY_NOTICE,))
+                self.conn.execute('DROP TABLE sent')
+
+    @staticmethod
+    def key(employee, task, notice):
+        """Clave con la que se registra un aviso de una tarea (por su id)"""
+        return (employee, task.id, task.due_date.isoformat(), notice)
+
+    @staticmethod
+    def named_key(employee, task, notice):
+        """Clave por nombre de los registros anteriores a los identificadores"""
+        return (employee, task.name, task.due_date.isoformat(), notice)
+
+    def was_sent(self, employee, task, notice):
+        """Indica si ya se envió ese aviso de esta tarea"""
+        if task.id is not None:
+            row = self.conn.execute('SELECT 1 FROM task_notices '
+                                    'WHERE employee = ? AND task_id = ? AND due_date = ? AND notice = ?',
+                                    self.key(employee, task, notice)).fetchone()
+            if row is not None:
+                return True
+        if not self._named:
+            return False
+        named_key = self.named_key(employee, task, notice)
+        row = self.conn.execute('SELECT sent_at FROM notices '
+                                'WHERE employee = ? AND task = ? AND due_date = ? AND notice = ?', named_key).fetchone()
+        if row is None:
+            return False
+        if task.id is not None:
+            # El registro antiguo pasa a la primera tarea con ese nombre que lo consulta; las demás
+            # tareas con el mismo nombre y vencimiento ya no lo encuentran
+            with self.conn:
+                self.conn.execute('DELETE FROM notices WHERE employee = ? AND task = ? AND due_date = ? AND notice = ?',
+                                  named_key)
+                self.conn.execute('INSERT OR IGNORE INTO task_notices (employee, task_id, due_date, notice, sent_at) '
+                                  'VALUES (?, ?, ?, ?, ?)', self.key(employee, task, notice) + row)
+        return True
+
+    def record(self, items, sent_at=None):
+        """Registra como enviados los avisos (empleado, tarea, aviso)"""
+        sent_at = (sent_at or datetime.now()).isoformat(timespec='seconds')
+        by_id = [self.key(employee, task, notice) + (sent_at,) for employee, task, notice in items
+                 if task.id is not None]
+        named = [self.named_key(employee, task, notice) + (sent_at,) for employee, task, notice in items
+                 if task.id is None]
+        with self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO task_notices (employee, task_id, due_date, notice, sent_at) '
+                                  'VALUES (?, ?, ?, ?, ?)', by_id)
+            self.conn.executemany('INSERT OR IGNORE INTO notices (employee, task, due_date, notice, sent_at) '
+                                  'VALUES (?, ?, ?, ?, ?)', named)
+        if named:
+            self._named = True
+
+    def last_run(self):
+        """Hora de la última ejecución completa o None si no hay ninguna"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_run'").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def last_run_policies(self):
+        """Huella de las políticas con las que se hizo la última ejecución completa o None"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'policies'").fetchone()
+        return row[0] if row else None
+
+    def set_last_run(self, run_at, policies=None):
+        """Guarda la hora de la última ejecución completa y la huella de sus políticas"""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_run', ?)", (run_at.isoformat(),))
+            if policies is None:
+                self.conn.execute("DELETE FROM meta WHERE key = 'policies'")
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('policies', ?)", (policies,))
+
+    def prune(self, before_date):
+        """Olvida los recordatorios de tareas que vencieron antes de esa fecha"""
+        with self.conn:
+            self.conn.execute('DELETE FROM task_notices WHERE due_date < ?', (before_date.isoformat(),))
+            self.conn.execute('DELETE FROM notices WHERE due_date < ?', (before_date.isoformat(),))
+
+    def close(self):
+        """Cierra la conexión con la base de datos"""
+        self.conn.close()
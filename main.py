@@ -1,100 +1,47 @@
-from datetime import datetime, timedelta
-import json
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 import sys
-import os
-from dotenv import load_dotenv
-from PyQt5.QtCore import Qt
+import threading
+from itertools import islice
+import core
+import notifier
+from dispatcher import CANCELLED
+from config import EMAIL_CONFIG, EMPLOYEE_FILE, LEDGER_FILE
+from ledger import NotificationLedger
+from models import Task, parse_due_date
+from repository import TaskRepository
+from PyQt5.QtCore import QAbstractTableModel, QDate, QEvent, QModelIndex, QObject, QThread, Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QFont
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, QInputDialog, QMessageBox, QProgressDialog)
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel, QPushButton, QVBoxLayout, QWidget, QInputDialog, QMessageBox, QProgressDialog,
+                             QAbstractItemView, QCheckBox, QComboBox, QDateEdit, QHBoxLayout, QHeaderView, QLineEdit, QTableView)
 
-#Cargar variables desde el archivo .env
-load_dotenv()
+# La configuración (correo, rutas y almacenamiento) está en config.py
 
+# ------------------------- Clases -------------------------
 
-# Configuración de correo
-EMAIL_CONFIG = {
-<<<<<<< HEAD
-    'from_email': ' Introducir correo del emisor ', # RELLENAR
-    'password': ' Introducir contraseña de aplicación (IMPORTANTE) del correo ', # RELLENAR
-=======
-    'from_email': os.getenv('EMAIL_USER') , # RELLENAR con email que quieres que envie el correo
-    'password': os.getenv('PASS_USER'), # RELLENAR contraseña de aplicación
->>>>>>> bc893c5 (Creando archivo .env)
-    'smtp_server': 'smtp.gmail.com', # Servidor por el que se mandan los correos
-    'smtp_port': 587, # Puerto de conexión con el servidor
-    'subject': 'Recordatorio de tarea',
-}
-
-# Ruta absoluta donde guardar el archivo .json
-EMPLOYEE_FILE = './info_empleados.json' # RELLENAR con ruta absoluta si se uiere guardar en otro sitio
+def show_error(text):
+    """Muestra un cuadro de diálogo de error"""
+    msg = QMessageBox()
+    msg.setWindowTitle('Error')  # Título del mensaje     
+    msg.setText(text)  # Contenido del mensaje
+    msg.setIcon(QMessageBox.Critical)  # Tipo de mensaje: Error
+    msg.setStandardButtons(QMessageBox.Ok)  # Botón de cierre
+    msg.exec_()  # Muestra el cuadro de diálogo
 
-# ------------------------- Clases -------------------------
 
-class EmployeeManager:
+class EmployeeManager(core.EmployeeManager):
     """Gestión de empleados."""
     
-    def __init__(self, employee_file):
-        self.employee_file = employee_file
-        self.employees = self.load_employees()
-    
-    def load_employees(self):
-        """Abre el archivo.json donde se encuentran los empleados y sus correos"""
-        #OUTPUT
-        #-Devuelve un diccionario con los empleados y sus correos
-        try:
-            with open(self.employee_file, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            with open(self.employee_file, 'w') as file:
-                json.dump({}, file)
-            return {}
-    
-    def save_employees(self):
-        """Guarda el archivo con los empleados"""
-        with open(self.employee_file, 'w') as file:
-            json.dump(self.employees, file, indent=2)
-    
     def add_employee(self):
         """Añade emplados al archivo"""
         username, ok = QInputDialog.getText(None, 'Añadir Empleado', 'Indique el nombre del usuario junto con la primera letra de los apellidos:')
         if ok:
             email, ok = QInputDialog.getText(None, 'Añadir Empleado', 'Introduce el correo del usuario:')
             if ok: 
-                self.employees[username.lower()] = email
-
-    def list_employees(self):
-        """Lista los empleados guardados""" 
-        employees_text = '\n'.join(f"{i + 1}. {name} - {email}" for i, (name, email) in enumerate(self.employees.items()))
-        QMessageBox.information(None, 'Lista de Empleados', employees_text)
+                super().add_employee(username, email)
 
 
-class TaskManager:
+class TaskManager(core.TaskManager):
     """Gestión de tareas."""
     
-    def __init__(self, employee_name):
-        self.task_file = f'./{employee_name}.json' # RELLENAR con ruta absoluta si se quiere guardar en otro sitio
-        self.tasks = self.load_tasks()
-    
-    def load_tasks(self):
-        """Abre el archivo.json donde se encuentran las tareas"""
-        #OUTPUT
-        #-Devuelve una lista con las tareas
-        try:
-            with open(self.task_file, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            with open(self.task_file, 'w') as file:
-                json.dump([], file)
-            return []
-    
-    def save_tasks(self):
-        """Guarda las tareas en el archivo.json"""
-        with open(self.task_file, 'w') as file:
-            json.dump(self.tasks, file, indent=2)
-    
     def add_task(self):
         """Añade tareas a la lista"""
         task_name, ok = QInputDialog.getText(None, 'Añadir Tarea', 'Indique el nombre de la tarea:')
@@ -103,68 +50,195 @@ class TaskManager:
             if ok:
                 due_date, ok = QInputDialog.getText(None, 'Añadir Tarea', 'Introduce la fecha de de vencimineto (dd-mm-yy):')
                 if ok:                    
-                    task = {
-                        'task': task_name,
-                        'priority': priority,
-                        'due_date': due_date,
-                        'status': 'Pendiente',
-                    }
-        self.tasks.append(task)
-        self.tasks.sort(key=lambda t: (datetime.strptime(t['due_date'], '%d-%m-%y'), int(t['priority'])))
-        
+                    try:
+                        task = Task(task_name, int(priority), parse_due_date(due_date))
+                    except ValueError:
+                        show_error('Prioridad o fecha no válida.')
+                        return
+                    self.insert_task(task)
     
-    def complete_task(self):
+    def complete_task(self, task_index=None):
         """Completa las tareas de la lista"""
-        task_index, ok = QInputDialog.getInt(None, 'Añadir Tarea', 'Indique el número de la tarea:')
-        if ok and 0 < task_index <= len(self.tasks):
-            self.tasks[task_index - 1]['status'] = 'Completada'
-        elif ok and (0 == task_index or task_index > len(self.tasks)):
-            msg = QMessageBox()
-            msg.setWindowTitle('Error')  # Título del mensaje     
-            msg.setText('Número introducido no válido.')  # Contenido del mensaje
-            msg.setIcon(QMessageBox.Critical)  # Tipo de mensaje: Error
-            msg.setStandardButtons(QMessageBox.Ok)  # Botón de cierre
-            msg.exec_()  # Muestra el cuadro de diálogo
+        #INPUT
+        #-task_index: número de la tarea; si no se indica se pregunta
+        if task_index is None:
+            task_index, ok = QInputDialog.getInt(None, 'Añadir Tarea', 'Indique el número de la tarea:')
+            if not ok:
+                return
+        try:
+            super().complete_task(task_index)
+        except IndexError as e:
+            show_error(str(e))
     
-    def delete_task(self):
+    def delete_task(self, task_index=None):
         """Elimina las tareas de la lista"""
-        task_index, ok = QInputDialog.getInt(None, 'Eliminar Tarea', 'Indique el número de la tarea:')
-        if 0 < task_index <= len(self.tasks):
-            del self.tasks[task_index - 1]
-        elif ok and (0 == task_index or task_index > len(self.tasks)):
-            msg = QMessageBox()
-            msg.setWindowTitle('Error')  # Título del mensaje     
-            msg.setText('Número introducido no válido.')  # Contenido del mensaje
-            msg.setIcon(QMessageBox.Critical)  # Tipo de mensaje: Error
-            msg.setStandardButtons(QMessageBox.Ok)  # Botón de cierre
-            msg.exec_()  # Muestra el cuadro de diálogo
-    
-    def list_tasks(self):
-        """Enumera todas las tareas que hay en la lista"""
-        tasks_text = '\n'.join(f"{i + 1}. {task['task']} | Prioridad: {task['priority']} | {task['due_date']} | Estado: {task['status']}" for i, task in enumerate(self.tasks))
-        QMessageBox.information(None, 'Lista de Tareas', tasks_text)
-
-
-class EmailNotifier:
+        #INPUT
+        #-task_index: número de la tarea; si no se indica se pregunta
+        if task_index is None:
+            task_index, ok = QInputDialog.getInt(None, 'Eliminar Tarea', 'Indique el número de la tarea:')
+            if not ok:
+                return
+        try:
+            super().delete_task(task_index)
+        except IndexError as e:
+            show_error(str(e))
+
+
+class LazyTableModel(QAbstractTableModel):
+    """Tabla que pide las filas a su origen por bloques a medida que la vista las necesita."""
+    BATCH_SIZE = 200  # Filas que se añaden cada vez que la vista llega al final
+    headers = ()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+        self._rows = []
+        self._source = iter(())
+        self._exhausted = True
+
+    def rows(self):
+        """Filas filtradas y ordenadas; se recorren solo hasta donde llegue la vista"""
+        raise NotImplementedError
+
+    def cell(self, row, column):
+        """Texto de una celda"""
+        raise NotImplementedError
+
+    def refresh(self):
+        """Vuelve a pedir las filas, p. ej. después de un cambio o de cambiar los filtros"""
+        self.beginResetModel()
+        self._rows = []
+        self._source = iter(self.rows())
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()  # El primer bloque enseguida; el resto cuando la vista llegue al final
+
+    def row(self, index):
+        """Fila de la tabla en esa posición"""
+        return self._rows[index]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.cell(self._rows[index.row()], index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        batch = list(islice(self._source, self.BATCH_SIZE))
+        if len(batch) < self.BATCH_SIZE:
+            self._exhausted = True
+        if batch:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(batch) - 1)
+            self._rows.extend(batch)
+            self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.refresh()
+
+
+class TaskTableModel(LazyTableModel):
+    """Tareas de un empleado con filtros por estado, prioridad y fechas."""
+    headers = ('Nº', 'Tarea', 'Prioridad', 'Vencimiento', 'Estado')
+    # Columnas que no siguen el orden de la lista (fecha y prioridad) y hay que ordenar aparte
+    sort_keys = {
+        1: lambda row: row[1].name.lower(),
+        2: lambda row: (row[1].priority, row[1].sort_key),
+        4: lambda row: (row[1].status, row[1].sort_key),
+    }
+
+    def __init__(self, task_manager, parent=None):
+        super().__init__(parent)
+        self.task_manager = task_manager
+        self.status = None
+        self.priority = None
+        self.first_date = None
+        self.last_date = None
+
+    def set_filters(self, status=None, priority=None, first_date=None, last_date=None):
+        """Cambia los filtros y vuelve a cargar la tabla"""
+        self.status, self.priority = status, priority
+        self.first_date, self.last_date = first_date, last_date
+        self.refresh()
+
+    def rows(self):
+        descending = self.sort_order == Qt.DescendingOrder
+        if self.sort_column not in self.sort_keys:
+            # La lista ya está ordenada por fecha y prioridad: se recorre sin copiarla
+            return self.task_manager.iter_tasks(self.status, self.priority, self.first_date, self.last_date,
+                                                reverse=descending)
+        rows = self.task_manager.iter_tasks(self.status, self.priority, self.first_date, self.last_date)
+        return sorted(rows, key=self.sort_keys[self.sort_column], reverse=descending)
+
+    def cell(self, row, column):
+        number, task = row
+        return (str(number), task.name, str(task.priority), task.due_str, task.status)[column]
+
+
+class EmployeeTableModel(LazyTableModel):
+    """Empleados con filtro por nombre o correo."""
+    headers = ('Nº', 'Empleado', 'Correo')
+
+    def __init__(self, employee_manager, parent=None):
+        super().__init__(parent)
+        self.employee_manager = employee_manager
+        self.text = None
+
+    def set_filter(self, text):
+        """Muestra solo los empleados cuyo nombre o correo contiene el texto"""
+        self.text = text or None
+        self.refresh()
+
+    def rows(self):
+        descending = self.sort_order == Qt.DescendingOrder
+        if self.sort_column == 0:
+            return self.employee_manager.iter_employees(self.text, reverse=descending)
+        rows = self.employee_manager.iter_employees(self.text)
+        return sorted(rows, key=lambda row: row[self.sort_column].lower(), reverse=descending)
+
+    def cell(self, row, column):
+        return str(row[column]) if column == 0 else row[column]
+
+
+def make_table(model):
+    """Vista de tabla con el estilo de la aplicación"""
+    table = QTableView()
+    table.setModel(model)
+    table.setSortingEnabled(True)
+    table.sortByColumn(0, Qt.AscendingOrder)
+    table.setSelectionBehavior(QAbstractItemView.SelectRows)
+    table.setSelectionMode(QAbstractItemView.SingleSelection)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.verticalHeader().setVisible(False)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    table.setStyleSheet("color: #FFFFFF; background-color: #23272A; gridline-color: #444444;")
+    return table
+
+
+class EmailNotifier(notifier.EmailNotifier):
     """Clase para manejar notificaciones por correo."""
     
-    def __init__(self, config):
-        self.config = config
-    
     def send_email(self, to_email, message):
         """Envia el email al usuario correspondiente"""
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.config['from_email']
-            msg["To"] = to_email
-            msg['Subject'] = self.config['subject']
-            msg.attach(MIMEText(message, 'plain'))
-            
-            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'])
-            server.starttls()
-            server.login(self.config['from_email'], self.config['password'])
-            server.send_message(msg)
-            server.quit()
+            self.deliver(to_email, message)
             # Crear mensaje de información
             msg = QMessageBox()
             msg.setWindowTitle("Información")  # Título del mensaje     
@@ -172,42 +246,134 @@ class EmailNotifier:
             msg.setIcon(QMessageBox.Information)  # Tipo de mensaje: Información
             msg.setStandardButtons(QMessageBox.Ok)  # Botón de cierre
             msg.exec_()  # Muestra el cuadro de diálogo
-        except Exception as e:
-            msg = QMessageBox()
-            msg.setWindowTitle("Error")  # Título del mensaje     
-            msg.setText("f'Error al enviar correo: {e}'")  # Contenido del mensaje
-            msg.setIcon(QMessageBox.Critical)  # Tipo de mensaje: Error
-            msg.setStandardButtons(QMessageBox.Ok)  # Botón de cierre
-            msg.exec_()  # Muestra el cuadro de diálogo
-        
+            return True
+        except notifier.SEND_ERRORS as e:
+            show_error(f'Error al enviar correo: {e}')
+            return False
 
 
-class ReminderService:
+class ReminderWorker(QObject):
+    """Envía los recordatorios en un hilo aparte para no bloquear la ventana."""
+    total = pyqtSignal(int)  # Número de correos que se van a enviar
+    progress = pyqtSignal(int, str)  # Correos terminados y estado del último
+    finished = pyqtSignal(list)  # SendResult de todos los correos
+    failed = pyqtSignal(str)  # Error que ha impedido terminar
+
+    def __init__(self, reminder_service):
+        super().__init__()
+        self.reminder_service = reminder_service
+        self.cancel_event = threading.Event()
+        self._done = 0
+        self._lock = threading.Lock()
+
+    @pyqtSlot()
+    def run(self):
+        """Prepara y envía todos los correos emitiendo el progreso"""
+        try:
+            # El almacenamiento se abre de nuevo porque SQLite no comparte conexiones entre hilos
+            storage = self.reminder_service.employee_manager.storage.clone()
+            try:
+                run = self.reminder_service.prepare(storage=storage)
+            finally:
+                if storage is not self.reminder_service.employee_manager.storage:
+                    storage.close()
+            self.total.emit(len(run.messages))
+            results = self.reminder_service.send_messages(run.messages, self._on_result, self.cancel_event)
+            run.finish(results)
+        except Exception as e:  # Se muestra en la ventana en lugar de perderse en el hilo
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(results)
+
+    def _on_result(self, result):
+        # Se llama desde los hilos del dispatcher
+        with self._lock:
+            self._done += 1
+            done = self._done
+        status = 'enviado' if result.success else f'error ({result.error})'
+        self.progress.emit(done, f'{result.to_email}: {status}')
+
+    def cancel(self):
+        """Pide que no se envíen más correos (se llama desde el hilo de la ventana)"""
+        self.cancel_event.set()
+
+
+class ReminderService(QObject, core.ReminderService):
     """Servicio para verificar y enviar recordatorios de tareas."""   
-    def __init__(self, employee_manager, email_notifier):
-        self.employee_manager = employee_manager
-        self.email_notifier = email_notifier
+
+    def __init__(self, employee_manager, email_notifier, ledger=None, policies=None):
+        # Es un QObject para que las señales del hilo lleguen al hilo de la ventana. PyQt5 pasa
+        # los argumentos con nombre que no usa QObject al __init__ de core.ReminderService
+        super().__init__(employee_manager=employee_manager, email_notifier=email_notifier, ledger=ledger,
+                         policies=policies)
+        self.worker_thread = None
    
     def check_and_notify(self):
         """Repasa todas las tareas de cada usuario, si estan pendientes y falta menos de 1 dia envia el correo"""
-        progress = QProgressDialog("Revisando tareas y enviando notificaciones...", None, 0, 0)
-        progress.setWindowTitle("Procesando")
-        progress.setWindowModality(Qt.ApplicationModal)
-        progress.setCancelButton(None)
-        progress.show()
-
-        current_date = datetime.now()
-        for employee, email in self.employee_manager.employees.items():
-            task_manager = TaskManager(employee)
-            for task in task_manager.tasks:
-                due_date = datetime.strptime(task['due_date'], '%d-%m-%y')
-                if task['status'] == 'Pendiente' and timedelta(0) <= (due_date - current_date) <= timedelta(days=1):
-                    message = (f"Hola, recuerda que la tarea '{task['task']}' vence el {task['due_date']}.")
-                    self.email_notifier.send_email(email, message)
-
-        progress.close()  # Cierra el cuadro cuando termina
-
-        QMessageBox.information(None, "Proceso Completo", "Las notificaciones han sido enviadas.")
+        if self.worker_thread is not None:  # Ya hay un envío en marcha
+            return
+        self.progress = QProgressDialog("Revisando tareas...", "Cancelar", 0, 0)
+        self.progress.setWindowTitle("Procesando")
+        self.progress.setWindowModality(Qt.ApplicationModal)
+        self.progress.setAutoClose(False)
+        self.progress.setAutoReset(False)
+        self.progress.show()
+
+        # El envío se hace en otro hilo y la ventana se actualiza con sus señales
+        self.worker_thread = QThread()
+        self.worker = ReminderWorker(self)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.total.connect(self._on_total)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.failed.connect(self._on_failed)
+        self.progress.canceled.connect(self._on_cancel)
+        self.worker_thread.start()
+
+    @pyqtSlot()
+    def _on_cancel(self):
+        # El hilo del worker está ocupado enviando, así que se avisa directamente
+        if self.worker_thread is not None:
+            self.worker.cancel()
+            self.progress.setLabelText("Cancelando...")
+
+    @pyqtSlot(int)
+    def _on_total(self, total):
+        self.progress.setMaximum(max(total, 1))
+        self.progress.setLabelText(f"Enviando {total} notificaciones...")
+
+    @pyqtSlot(int, str)
+    def _on_progress(self, done, status):
+        self.progress.setValue(done)
+        self.progress.setLabelText(status)
+
+    def _finish_thread(self):
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+        self.worker_thread = None
+        self.progress.close()  # Cierra el cuadro cuando termina
+
+    @pyqtSlot(list)
+    def _on_finished(self, results):
+        self._finish_thread()
+        # Un único resumen en lugar de un mensaje por correo
+        cancelled = [result for result in results if result.error == CANCELLED]
+        failed = [result for result in results if not result.success and result.error != CANCELLED]
+        sent = len(results) - len(failed) - len(cancelled)
+        summary = f"Se han enviado {sent} de {len(results)} notificaciones."
+        if cancelled:
+            summary += f"\nCanceladas: {len(cancelled)}."
+        if failed:
+            summary += '\n\nErrores:\n' + '\n'.join(f"{result.to_email}: {result.error}" for result in failed[:20])
+            if len(failed) > 20:
+                summary += f"\n... y {len(failed) - 20} más."
+        QMessageBox.information(None, "Proceso Completo", summary)
+
+    @pyqtSlot(str)
+    def _on_failed(self, error):
+        self._finish_thread()
+        show_error(f'Error al enviar las notificaciones: {error}')
 
 
 class MainMenu(QMainWindow): # Clase para crear la ventana principal
@@ -216,7 +382,9 @@ class MainMenu(QMainWindow): # Clase para crear la ventana principal
         # Inicializar las clases anteriores
         self.employee_manager = EmployeeManager(EMPLOYEE_FILE)
         self.email_notifier = EmailNotifier(EMAIL_CONFIG)
-        self.reminder_service = ReminderService(self.employee_manager, self.email_notifier)
+        self.reminder_service = ReminderService(self.employee_manager, self.email_notifier, NotificationLedger(LEDGER_FILE))
+        # Todas las ventanas de tareas comparten la misma copia en memoria de cada empleado
+        self.task_repository = TaskRepository(self.employee_manager.storage)
 
         # Configuración de la ventana principal
         self.setWindowTitle('Automatización de tareas')
@@ -271,7 +439,7 @@ class MainMenu(QMainWindow): # Clase para crear la ventana principal
         
         self.button2 = QPushButton("Listar empleados")
         self.button2.setStyleSheet(button_style)
-        self.button2.clicked.connect(self.employee_manager.list_employees)
+        self.button2.clicked.connect(self.open_employee_list)
         
         self.button3 = QPushButton("Gestionar tareas de un empleado")
         self.button3.setStyleSheet(button_style)
@@ -307,27 +475,55 @@ class MainMenu(QMainWindow): # Clase para crear la ventana principal
         """ Función para abrir la ventana TaskMenu """
         employee_name, ok = QInputDialog.getText(None, 'Accediendo a empleado', 'Indique el nombre del usuario junto con la primera letra de los apellidos:')
         if ok and employee_name in self.employee_manager.employees:
-            self.task_manager = TaskManager(employee_name)
-            self.task_menu = TaskMenu(employee_name)  # Crear instancia de TaskMenu
+            self.task_menu = TaskMenu(employee_name, repository=self.task_repository)  # Crear instancia de TaskMenu
             self.task_menu.show()  # Mostrar la ventana
         elif employee_name not in self.employee_manager.employees:
-            msg = QMessageBox()
-            msg.setWindowTitle("Error")  # Título del mensaje     
-            msg.setText("El empleado no está añadido a la lista principal.")  # Contenido del mensaje
-            msg.setIcon(QMessageBox.Critical)  # Tipo de mensaje: Error
-            msg.setStandardButtons(QMessageBox.Ok)  # Botón de cierre
-            msg.exec_()  # Muestra el cuadro de diálogo
+            show_error("El empleado no está añadido a la lista principal.")
     
+    def open_employee_list(self):
+        """Abre la ventana con la lista de empleados"""
+        self.employee_list = EmployeeListWindow(self.employee_manager)
+        self.employee_list.show()
+
     def exit_app(self):
         """Función que guarda el archivo.json de los empleados y sale de la app"""
         self.employee_manager.save_employees()
         sys.exit()
 
 
+FILTER_STYLE = "color: #FFFFFF; font-size: 14px;"
+
+
+class EmployeeListWindow(QWidget):
+    """Lista de empleados en una tabla que se carga a medida que se desplaza."""
+
+    def __init__(self, employee_manager):
+        super().__init__()
+        self.setWindowTitle('Lista de empleados')
+        self.setGeometry(150, 150, 600, 500)
+        self.setStyleSheet('background-color: #2C2F33;')
+        layout = QVBoxLayout()
+
+        # Filtro por nombre o correo
+        self.search = QLineEdit()
+        self.search.setPlaceholderText('Buscar por nombre o correo')
+        self.search.setStyleSheet(FILTER_STYLE)
+        self.search.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.search)
+
+        self.model = EmployeeTableModel(employee_manager, self)
+        self.table = make_table(self.model)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+    def apply_filter(self, text):
+        self.model.set_filter(text.strip())
+
+
 class TaskMenu(QWidget):
-    def __init__(self, employee_name):
+    def __init__(self, employee_name, storage=None, repository=None):
         super().__init__()    
-        self.task_manager = TaskManager(employee_name) 
+        self.task_manager = TaskManager(employee_name, storage, repository)
         
         # Configuración de la ventana principal
         self.setWindowTitle('Automatización de tareas')
@@ -370,19 +566,19 @@ class TaskMenu(QWidget):
         #Añadir botones y sus respectivas funciones
         self.button1 = QPushButton("Añadir tarea")
         self.button1.setStyleSheet(button_style)
-        self.button1.clicked.connect(self.task_manager.add_task)
+        self.button1.clicked.connect(self.add_task)
 
         self.button2 = QPushButton("Completar tarea")
         self.button2.setStyleSheet(button_style)
-        self.button2.clicked.connect(self.task_manager.complete_task)
+        self.button2.clicked.connect(self.complete_task)
 
         self.button3 = QPushButton("Eliminar tarea")
         self.button3.setStyleSheet(button_style)
-        self.button3.clicked.connect(self.task_manager.delete_task)
+        self.button3.clicked.connect(self.delete_task)
 
-        self.button4 = QPushButton("Listar tareas")
+        self.button4 = QPushButton("Listar todas las tareas")
         self.button4.setStyleSheet(button_style)
-        self.button4.clicked.connect(self.task_manager.list_tasks)
+        self.button4.clicked.connect(self.clear_filters)
 
         self.button5 = QPushButton("Volver al menú principal")
         self.button5.setStyleSheet(button_style)
@@ -395,6 +591,33 @@ class TaskMenu(QWidget):
         button_layout.addWidget(self.button5)
         layout.addLayout(button_layout)
 
+        # Filtros de la tabla de tareas
+        filter_layout = QHBoxLayout()
+        self.status_filter = QComboBox()
+        self.status_filter.addItems(['Todos los estados', 'Pendiente', 'Completada'])
+        self.priority_filter = QComboBox()
+        self.priority_filter.addItems(['Todas las prioridades', '1. Alta', '2. Media', '3. Baja'])
+        self.date_filter = QCheckBox('Vencen entre')
+        today = QDate.currentDate()
+        self.first_date = QDateEdit(today)
+        self.last_date = QDateEdit(today.addDays(7))
+        for widget in (self.status_filter, self.priority_filter, self.date_filter, self.first_date, self.last_date):
+            widget.setStyleSheet(FILTER_STYLE)
+            filter_layout.addWidget(widget)
+        for date_edit in (self.first_date, self.last_date):
+            date_edit.setDisplayFormat('dd-MM-yy')
+            date_edit.setCalendarPopup(True)
+            date_edit.dateChanged.connect(self.apply_filters)
+        self.status_filter.currentIndexChanged.connect(self.apply_filters)
+        self.priority_filter.currentIndexChanged.connect(self.apply_filters)
+        self.date_filter.stateChanged.connect(self.apply_filters)
+        layout.addLayout(filter_layout)
+
+        # Tabla de tareas: las filas se cargan a medida que se desplaza
+        self.model = TaskTableModel(self.task_manager, self)
+        self.table = make_table(self.model)
+        layout.addWidget(self.table)
+
         # Pie de página
         footer = QLabel("© 2025 Jordigb_17. Todos los derechos reservados.")
         footer.setFont(QFont("Arial", 10))
@@ -404,6 +627,50 @@ class TaskMenu(QWidget):
 
         # Aplicar el diseño al contenedor principal
         self.setLayout(layout)
+
+    def apply_filters(self):
+        """Aplica a la tabla los filtros seleccionados"""
+        status = self.status_filter.currentText() if self.status_filter.currentIndex() > 0 else None
+        priority = self.priority_filter.currentIndex() or None
+        first_date = last_date = None
+        if self.date_filter.isChecked():
+            first_date, last_date = self.first_date.date().toPyDate(), self.last_date.date().toPyDate()
+        self.model.set_filters(status, priority, first_date, last_date)
+
+    def clear_filters(self):
+        """Quita los filtros y muestra todas las tareas"""
+        for widget in (self.status_filter, self.priority_filter, self.date_filter):
+            widget.blockSignals(True)
+        self.status_filter.setCurrentIndex(0)
+        self.priority_filter.setCurrentIndex(0)
+        self.date_filter.setChecked(False)
+        for widget in (self.status_filter, self.priority_filter, self.date_filter):
+            widget.blockSignals(False)
+        self.apply_filters()
+
+    def selected_number(self):
+        """Número en la lista de la tarea seleccionada en la tabla o None"""
+        rows = self.table.selectionModel().selectedRows()
+        return self.model.row(rows[0].row())[0] if rows else None
+
+    def add_task(self):
+        self.task_manager.add_task()
+        self.model.refresh()
+
+    def complete_task(self):
+        # Si hay una tarea seleccionada se usa esa; si no se pregunta el número
+        self.task_manager.complete_task(self.selected_number())
+        self.model.refresh()
+
+    def delete_task(self):
+        self.task_manager.delete_task(self.selected_number())
+        self.model.refresh()
+
+    def changeEvent(self, event):
+        # Al volver a esta ventana se ven los cambios hechos desde otra ventana u otro proceso
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.model.refresh()
+        super().changeEvent(event)
     
     def exit_taskmenu(self):
         """Función para guardar el archivo de tareas y salir a la ventana principal"""
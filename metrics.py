@@ -0,0 +1,178 @@
+"""Contadores y tiempos de cada etapa del recordatorio.
+
+Las funciones de este módulo no hacen nada hasta que se llama a enable(), así
+que el coste con las métricas desactivadas es una llamada y una comparación.
+Con enable() se recogen:
+- Contadores: archivos leídos, tareas revisadas, recordatorios encontrados,
+  correos enviados y fallidos, reconexiones y reintentos SMTP...
+- Histogramas de tiempos: carga de tareas, preparación, conexión, login y envío
+  SMTP y duración total de la ejecución.
+
+Al terminar se pueden guardar como informe JSON (write_json) o como archivo de
+texto para el textfile collector de Prometheus (write_prometheus).
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Límites (en segundos) de los intervalos de los histogramas
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PROMETHEUS_PREFIX = 'gestor_tareas_'
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Número de observaciones por intervalo, más suma y máximo."""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # El último es +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(BUCKETS) and value > BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'buckets': {str(bound): count for bound, count in zip(BUCKETS + ('+Inf',), self.counts)},
+        }
+
+
+class Metrics:
+    """Contadores e histogramas de una ejecución; se pueden usar desde varios hilos."""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def report(self):
+        """Devuelve el informe de la ejecución como diccionario"""
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())},
+            }
+
+    def prometheus_text(self):
+        """Devuelve las métricas en el formato de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f'{PROMETHEUS_PREFIX}{name}_total'
+                lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f'{PROMETHEUS_PREFIX}{name}'
+                lines.append(f'# TYPE {metric} histogram')
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines += [f'{metric}_sum {histogram.sum}', f'{metric}_count {histogram.count}']
+        metric = f'{PROMETHEUS_PREFIX}last_run_timestamp_seconds'
+        lines += [f'# TYPE {metric} gauge', f'{metric} {time.time():.0f}']
+        return '\n'.join(lines) + '\n'
+
+
+# Métricas activas o None si están desactivadas
+_active = None
+
+
+def enable():
+    """Empieza a recoger métricas y devuelve el objeto Metrics"""
+    global _active
+    _active = Metrics()
+    return _active
+
+
+def disable():
+    """Deja de recoger métricas"""
+    global _active
+    _active = None
+
+
+def active():
+    """Devuelve las métricas activas o None"""
+    return _active
+
+
+def inc(name, value=1):
+    """Suma `value` al contador si las métricas están activas"""
+    if _active is not None:
+        _active.inc(name, value)
+
+
+def observe(name, seconds):
+    """Añade una duración al histograma si las métricas están activas"""
+    if _active is not None:
+        _active.observe(name, seconds)
+
+
+def timer(name):
+    """Bloque `with` que mide su duración en el histograma `name`"""
+    if _active is None:
+        return _NULL_TIMER
+    return _active.timer(name)
+
+
+def _write_atomic(path, text):
+    # Prometheus no debe leer nunca un archivo a medio escribir
+    directory = os.path.dirname(path) or '.'
+    with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.tmp-', delete=False) as file:
+        file.write(text)
+    # El temporal se crea con 0600 y el textfile collector suele ejecutarse con otro usuario
+    os.chmod(file.name, 0o644)
+    os.replace(file.name, path)
+
+
+def write_json(path, metrics=None):
+    """Guarda el informe de la ejecución en un archivo JSON"""
+    metrics = metrics or _active
+    if metrics is not None:
+        _write_atomic(path, json.dumps(metrics.report(), indent=2) + '\n')
+
+
+def write_prometheus(path, metrics=None):
+    """Guarda las métricas para el textfile collector de Prometheus (archivo .prom)"""
+    metrics = metrics or _active
+    if metrics is not None:
+        _write_atomic(path, metrics.prometheus_text())
@@ -0,0 +1,83 @@
+"""Registro compacto de una tarea.
+
+Las fechas se guardan en los archivos como texto 'dd-mm-yy'. Aquí se
+convierten una sola vez al cargar (a número de día, date.toordinal) para
+que ordenar y filtrar no tenga que volver a interpretar el texto.
+"""
+from datetime import date, datetime
+
+
+def parse_due_date(text):
+    """Convierte una fecha dd-mm-yy en su número de día (date.toordinal)"""
+    try:
+        day, month, year = text.split('-')
+        year = int(year)
+        if len(str(year)) > 2:
+            raise ValueError(text)
+        # Mismo criterio que %y: 00-68 son 2000-2068 y 69-99 son 1969-1999
+        year += 2000 if year < 69 else 1900
+        return date(year, int(month), int(day)).toordinal()
+    except ValueError:
+        # Deja que strptime dé el mensaje de error habitual
+        return datetime.strptime(text, '%d-%m-%y').toordinal()
+
+
+def format_due_date(ordinal):
+    """Convierte un número de día al formato dd-mm-yy de los archivos .json"""
+    d = date.fromordinal(ordinal)
+    return f'{d.day:02d}-{d.month:02d}-{d.year % 100:02d}'
+
+
+class Task:
+    """Tarea de un empleado con la fecha y la prioridad ya convertidas."""
+
+    __slots__ = ('name', 'priority', 'due_ordinal', 'status', 'id')
+
+    def __init__(self, name, priority, due_ordinal, status='Pendiente', id=None):
+        self.name = name
+        self.priority = priority
+        self.due_ordinal = due_ordinal
+        self.status = status
+        self.id = id
+
+    @classmethod
+    def from_dict(cls, data):
+        """Crea la tarea a partir de un diccionario de los archivos .json"""
+        return cls(data['task'], int(data['priority']), parse_due_date(data['due_date']),
+                   data['status'], data.get('id'))
+
+    def to_dict(self):
+        """Devuelve la tarea con el formato de los archivos .json"""
+        data = {
+            'task': self.name,
+            'priority': str(self.priority),
+            'due_date': self.due_str,
+            'status': self.status,
+        }
+        if self.id is not None:
+            data['id'] = self.id
+        return data
+
+    @property
+    def due_date(self):
+        """Fecha de vencimiento"""
+        return date.fromordinal(self.due_ordinal)
+
+    @property
+    def due_str(self):
+        """Fecha de vencimiento en formato dd-mm-yy"""
+        return format_due_date(self.due_ordinal)
+
+    @property
+    def sort_key(self):
+        """Orden de la lista de tareas: fecha de vencimiento y prioridad"""
+        return (self.due_ordinal, self.priority)
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return (self.name, self.priority, self.due_ordinal, self.status, self.id) == \
+               (other.name, other.priority, other.due_ordinal, other.status, other.id)
+
+    def __repr__(self):
+        return f'Task({self.name!r}, {self.priority}, {self.due_str!r}, {self.status!r})'
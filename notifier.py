@@ -0,0 +1,211 @@
+"""Envío de correos reutilizando conexiones SMTP autenticadas.
+
+Lo comparten main.py y cron_email_sender.py para no abrir una conexión,
+negociar STARTTLS y hacer login por cada recordatorio.
+"""
+import queue
+import smtplib
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import metrics
+from templates import compile_template
+
+# Errores de un envío concreto. ValueError incluye UnicodeEncodeError (smtplib no puede
+# codificar un destinatario con tildes) y las direcciones con saltos de línea
+SEND_ERRORS = (smtplib.SMTPException, OSError, ValueError)
+
+
+@dataclass
+class SendResult:
+    """Resultado del envío de un correo."""
+    to_email: str
+    success: bool
+    error: str = ''
+
+
+class SMTPSession:
+    """Conexión SMTP autenticada que se reutiliza entre envíos."""
+
+    def __init__(self, config):
+        self.config = config
+        self.server = None
+
+    def connect(self):
+        """Abre la conexión con el servidor, activa TLS y hace login"""
+        metrics.inc('smtp_connections')
+        server = None
+        try:
+            with metrics.timer('smtp_connect_seconds'):
+                server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'],
+                                      timeout=self.config.get('smtp_timeout', 30))
+                # Un servidor local de pruebas (aiosmtpd) no suele tener TLS ni login
+                if self.config.get('starttls', True):
+                    server.starttls()
+            if self.config.get('password'):
+                with metrics.timer('smtp_login_seconds'):
+                    server.login(self.config['from_email'], self.config['password'])
+        except Exception:
+            # Si falla STARTTLS o el login se cierra el socket; si no, cada reintento del
+            # dispatcher dejaría otra conexión abierta
+            if server is not None:
+                server.close()
+            raise
+        self.server = server
+
+    def close(self):
+        """Cierra la conexión si está abierta"""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            pass  # El servidor ya había cerrado la conexión
+        self.server = None
+
+    def send(self, from_email, to_email, data):
+        """Envía el correo ya codificado, reconectando una vez si el servidor cerró la sesión"""
+        if self.server is None:
+            self.connect()
+        try:
+            self._sendmail(from_email, to_email, data)
+        except SEND_ERRORS:
+            self._abort()
+            raise
+
+    def _sendmail(self, from_email, to_email, data):
+        try:
+            self.server.sendmail(from_email, [to_email], data)
+        except smtplib.SMTPServerDisconnected:
+            self._reconnect()
+            self.server.sendmail(from_email, [to_email], data)
+        except smtplib.SMTPResponseException as e:
+            if e.smtp_code != 421:  # 421: el servidor cierra el canal
+                raise
+            self._reconnect()
+            self.server.sendmail(from_email, [to_email], data)
+
+    def _abort(self):
+        # Una transacción a medias (p. ej. MAIL FROM aceptado y RCPT TO sin enviar) haría
+        # fallar el siguiente correo de la sesión: se reinicia o, si no responde, se cierra
+        if self.server is None:
+            return
+        try:
+            self.server.rset()
+        except (smtplib.SMTPException, OSError):
+            self.close()
+
+    def _reconnect(self):
+        metrics.inc('smtp_reconnects')
+        self.close()
+        self.connect()
+
+
+class SMTPSessionPool:
+    """Conjunto acotado de sesiones SMTP que se abren bajo demanda."""
+
+    def __init__(self, config, size=1):
+        self.config = config
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        """Presta una sesión libre y la devuelve al terminar el bloque"""
+        session = self._acquire()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._sessions) < self.size:
+                session = SMTPSession(self.config)
+                self._sessions.append(session)
+                return session
+        return self._idle.get()  # Espera a que otro envío libere una sesión
+
+    def close(self):
+        """Cierra todas las sesiones abiertas"""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+
+
+class EmailNotifier:
+    """Clase para manejar notificaciones por correo."""
+
+    def __init__(self, config):
+        self.config = config
+        self.pool = None
+        # Cabeceras y textos se preparan una vez y se reutilizan en todos los correos
+        self.template = compile_template(config)
+
+    def build_message(self, to_email, message):
+        """Construye el correo a partir del texto del mensaje"""
+        #OUTPUT
+        #-Devuelve los bytes del correo, listos para sendmail
+        return self.template.render(to_email, message)
+
+    @contextmanager
+    def session(self, size=1):
+        """Mantiene abiertas las conexiones SMTP durante todo el bloque"""
+        if self.pool is not None:  # Ya hay una sesión abierta más arriba
+            yield self.pool
+            return
+        self.pool = SMTPSessionPool(self.config, size)
+        try:
+            yield self.pool
+        finally:
+            self.pool.close()
+            self.pool = None
+
+    def deliver(self, to_email, message):
+        """Envía un correo y lanza la excepción si falla"""
+        try:
+            msg = self.build_message(to_email, message)
+            with self.session() as pool, pool.session() as session, metrics.timer('smtp_send_seconds'):
+                session.send(self.config['from_email'], to_email, msg)
+        except SEND_ERRORS:
+            metrics.inc('smtp_errors')
+            raise
+        metrics.inc('emails_sent')
+
+    def send_email(self, to_email, message):
+        """Envia el email al usuario correspondiente"""
+        try:
+            self.deliver(to_email, message)
+            print(f'Correo enviado a {to_email}')
+            return True
+        except SEND_ERRORS as e:
+            print(f'Error al enviar correo: {e}')
+            return False
+
+    def send_batch(self, messages):
+        """Envía una lista de (correo, mensaje) con una única conexión"""
+        #OUTPUT
+        #-Devuelve una lista de SendResult en el mismo orden que los mensajes
+        results = []
+        auth_error = None
+        with self.session():
+            for to_email, message in messages:
+                if auth_error is not None:  # No tiene sentido reintentar el login
+                    results.append(SendResult(to_email, False, auth_error))
+                    continue
+                try:
+                    self.deliver(to_email, message)
+                    results.append(SendResult(to_email, True))
+                except smtplib.SMTPAuthenticationError as e:
+                    auth_error = str(e)
+                    results.append(SendResult(to_email, False, auth_error))
+                except SEND_ERRORS as e:
+                    results.append(SendResult(to_email, False, str(e)))
+        return results
@@ -0,0 +1,193 @@
+"""Políticas de recordatorio: cuándo y a quién se avisa de cada tarea pendiente.
+
+Cada política es un diccionario de config.REMINDER_POLICIES:
+- Aviso previo ({'days_before': N}): la tarea vence en los próximos N días. Se
+  envía una sola vez por tarea.
+- Tarea vencida ({'overdue': True}): la tarea venció hace entre 'after_days' y
+  'max_days' días y sigue pendiente. Se repite cada 'every_days' días.
+Con 'priorities' la política solo se aplica a esas prioridades y con
+'escalate_to' el aviso de una tarea vencida va a esa dirección (p. ej. el
+responsable) en lugar de al empleado.
+
+Todas las políticas se evalúan en una sola pasada: se leen una vez las tareas
+pendientes que vencen en la unión de sus ventanas y cada tarea se compara en
+memoria con las políticas de su prioridad, así que añadir políticas no
+multiplica las lecturas.
+"""
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+from reminders import due_window
+from templates import DEFAULT_TEMPLATE
+
+UPCOMING, OVERDUE, ESCALATION = 'upcoming', 'overdue', 'escalation'
+
+
+@dataclass(frozen=True)
+class ReminderPolicy:
+    """Ventana de vencimientos, prioridades y destinatario de un aviso."""
+    name: str
+    days_before: int = 1
+    overdue: bool = False
+    after_days: int = 0
+    max_days: int = 30
+    every_days: int = 1
+    priorities: frozenset = None  # None: todas las prioridades
+    escalate_to: str = None
+
+    def __post_init__(self):
+        if not self.name or ':' in self.name:
+            raise ValueError(f"Nombre de política no válido: '{self.name}'")
+        if self.days_before < 1 or self.every_days < 1 or not 0 <= self.after_days <= self.max_days:
+            raise ValueError(f"Días no válidos en la política '{self.name}'")
+        if self.escalate_to and not self.overdue:
+            raise ValueError(f"La política '{self.name}' solo puede escalar tareas vencidas")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Crea la política a partir de un diccionario de la configuración"""
+        data = dict(data)
+        if data.get('priorities') is not None:
+            data['priorities'] = frozenset(data['priorities'])
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise ValueError(f'Política no válida {data}: {e}') from None
+
+    @property
+    def kind(self):
+        """Tipo de correo: a punto de vencer, vencida o escalado al responsable"""
+        if self.escalate_to:
+            return ESCALATION
+        return OVERDUE if self.overdue else UPCOMING
+
+    def window(self, run_at, since=None):
+        """Primer y último día de vencimiento que cubre la política en esta ejecución"""
+        #INPUT
+        #-since: última ejecución completa si nada ha cambiado desde entonces; solo se
+        # devuelven los días que han entrado en la ventana después de ella
+        if not self.overdue:
+            first_date, last_date = due_window(run_at, self.days_before)
+            if since is not None:
+                first_date = max(first_date, due_window(since, self.days_before)[1] + timedelta(days=1))
+            return first_date, last_date
+        today = run_at.date()
+        # Vence antes que la primera tarea que aún no ha vencido y lleva al menos after_days de retraso
+        last_date = min(due_window(run_at)[0] - timedelta(days=1), today - timedelta(days=self.after_days))
+        first_date = today - timedelta(days=self.max_days)
+        if since is not None and since.date() == today:
+            # El mismo día los avisos ya enviados no cambian: solo cuentan las tareas que acaban de vencer
+            first_date = max(first_date, self.window(since)[1] + timedelta(days=1))
+        return first_date, last_date
+
+    def notice(self, task, run_at):
+        """Identificador del aviso en el registro; en las vencidas cambia cada every_days días"""
+        if not self.overdue:
+            return self.name
+        late = run_at.toordinal() - task.due_ordinal - self.after_days
+        return f'{self.name}:{late // self.every_days}'
+
+
+class PolicyEngine:
+    """Conjunto de políticas que se evalúan juntas en una sola pasada."""
+
+    def __init__(self, policies):
+        self.policies = tuple(policies)
+        if not self.policies:
+            raise ValueError('Hace falta al menos una política de recordatorio')
+        names = [policy.name for policy in self.policies]
+        if len(set(names)) != len(names):
+            raise ValueError(f'Nombres de política repetidos: {", ".join(names)}')
+        self._by_priority = {}
+
+    @classmethod
+    def from_config(cls, entries):
+        """Crea el motor a partir de la lista de diccionarios de config.REMINDER_POLICIES"""
+        return cls([ReminderPolicy.from_dict(entry) for entry in entries])
+
+    def fingerprint(self):
+        """Huella de la configuración; si cambia hay que volver a revisar las ventanas completas"""
+        policies = [dict(asdict(policy), priorities=sorted(policy.priorities) if policy.priorities else None)
+                    for policy in sorted(self.policies, key=lambda policy: policy.name)]
+        return hashlib.sha1(json.dumps(policies, sort_keys=True).encode()).hexdigest()
+
+    def policies_for(self, priority):
+        """Políticas que se aplican a una prioridad (se calcula una vez por prioridad)"""
+        if priority not in self._by_priority:
+            self._by_priority[priority] = [policy for policy in self.policies
+                                           if policy.priorities is None or priority in policy.priorities]
+        return self._by_priority[priority]
+
+    def windows(self, run_at, since=None):
+        """Devuelve {política: (primer día, último día)} sin las ventanas vacías"""
+        windows = {}
+        for policy in self.policies:
+            first_date, last_date = policy.window(run_at, since)
+            if first_date <= last_date:
+                windows[policy] = (first_date, last_date)
+        return windows
+
+    @staticmethod
+    def span(windows):
+        """Primer y último día de la unión de las ventanas o None si están todas vacías"""
+        if not windows:
+            return None
+        return min(first for first, _ in windows.values()), max(last for _, last in windows.values())
+
+    def oldest_due(self, run_at):
+        """Vencimiento más antiguo que todavía puede recibir avisos (para limpiar el registro)"""
+        return min(policy.window(run_at)[0] for policy in self.policies)
+
+    def match(self, pairs, windows, run_at, ledger=None):
+        """Compara cada tarea con todas las políticas en una sola pasada"""
+        #INPUT
+        #-pairs: (empleado, tarea) pendientes que vencen dentro de span(windows)
+        #-ledger: si se indica, se omiten los avisos que ya se enviaron
+        #OUTPUT
+        #-Genera (política, aviso, empleado, tarea) por cada aviso que hay que enviar
+        ordinals = {policy: (first.toordinal(), last.toordinal()) for policy, (first, last) in windows.items()}
+        for employee, task in pairs:
+            for policy in self.policies_for(task.priority):
+                window = ordinals.get(policy)
+                if window is None or not window[0] <= task.due_ordinal <= window[1]:
+                    continue
+                notice = policy.notice(task, run_at)
+                if ledger is not None and ledger.was_sent(employee, task, notice):
+                    continue
+                yield policy, notice, employee, task
+
+
+def build_plan(matches, employees, digest=True, template=None):
+    """Agrupa los avisos por destinatario y tipo y prepara los correos"""
+    #INPUT
+    #-matches: (política, aviso, empleado, tarea) de PolicyEngine.match
+    #OUTPUT
+    #-Devuelve una lista de (correo, mensaje, [(empleado, tarea, aviso)]) para ReminderRun
+    template = template or DEFAULT_TEMPLATE
+    groups = {}  # (tipo, correo, empleado) -> {id de la tarea: (tarea, avisos)}
+    for policy, notice, employee, task in matches:
+        email = policy.escalate_to or employees.get(employee)
+        if not email:
+            continue
+        tasks = groups.setdefault((policy.kind, email, employee), {})
+        # Si varias políticas avisan de la misma tarea a la misma persona va una sola vez en el correo
+        tasks.setdefault(id(task), (task, []))[1].append((employee, task, notice))
+
+    plan = []
+    for (kind, email, employee), entries in groups.items():
+        if digest:
+            batches = [list(entries.values())]
+        else:
+            batches = [[entry] for entry in entries.values()]
+        for batch in batches:
+            tasks = [task for task, _ in batch]
+            if kind == ESCALATION:
+                message = template.escalation_body(employee, tasks)
+            elif kind == OVERDUE:
+                message = template.overdue_body(tasks)
+            else:
+                message = template.digest_body(tasks)
+            plan.append((email, message, [item for _, items in batch for item in items]))
+    return plan
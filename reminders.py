@@ -0,0 +1,15 @@
+"""Orden de las tareas y ventana de vencimiento de los recordatorios."""
+from datetime import time, timedelta
+
+
+def task_sort_key(task):
+    """Clave de orden de las tareas: fecha de vencimiento y prioridad"""
+    return task.sort_key
+
+
+def due_window(current_date, days=1):
+    """Primer y último día cuyo vencimiento (a las 00:00) cae entre ahora y dentro de `days` días"""
+    first_date = current_date.date()
+    if current_date.time() != time(0):
+        first_date += timedelta(days=1)
+    return first_date, (current_date + timedelta(days=days)).date()
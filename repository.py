@@ -0,0 +1,84 @@
+"""Copia única en memoria de las tareas de cada empleado.
+
+Las ventanas de la interfaz y los TaskManager de un mismo proceso comparten un
+TaskRepository: la primera vez que se piden las tareas de un empleado se leen
+y se ordenan, y las siguientes se devuelve la misma lista mientras no cambie
+la versión del almacenamiento (fecha de modificación y tamaño del .json y de su
+diario, o el contador de la tabla task_versions en SQLite). Si otro proceso
+(cron, cli.py) modifica las tareas, la siguiente consulta las vuelve a leer.
+
+Solo se guardan los empleados usados más recientemente (max_entries); al pasar
+del límite se descarta el menos usado.
+"""
+import threading
+from collections import OrderedDict
+
+import metrics
+from reminders import task_sort_key
+
+
+class TaskList:
+    """Tareas de un empleado ordenadas por fecha y prioridad, con sus claves de orden."""
+
+    __slots__ = ('tasks', 'keys', 'version')
+
+    def __init__(self, tasks, version):
+        self.tasks = tasks
+        # Claves de orden de tasks, para insertar con búsqueda binaria
+        self.keys = [task.sort_key for task in tasks]
+        self.version = version
+
+
+class TaskRepository:
+    """Caché LRU de las tareas por empleado que se invalida cuando cambia el almacenamiento."""
+
+    def __init__(self, storage, max_entries=64):
+        self.storage = storage
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # Empleado -> TaskList, del menos al más usado
+        self._lock = threading.RLock()
+
+    def get(self, employee):
+        """Devuelve las tareas del empleado, leyéndolas solo si han cambiado"""
+        #OUTPUT
+        #-Devuelve un TaskList; todos los que piden el mismo empleado reciben el mismo objeto
+        with self._lock:
+            version = self.storage.task_version(employee)
+            entry = self._entries.get(employee)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(employee)
+                metrics.inc('task_cache_hits')
+                return entry
+            metrics.inc('task_cache_misses')
+            tasks = self.storage.load_tasks(employee)
+            with metrics.timer('sort_tasks_seconds'):
+                tasks.sort(key=task_sort_key)  # Casi gratis si el archivo ya estaba ordenado
+            if entry is None:
+                entry = TaskList(tasks, version)
+            else:
+                # Se reutiliza el objeto para que quien lo tenga vea las tareas nuevas
+                entry.__init__(tasks, version)
+            self._entries[employee] = entry
+            self._entries.move_to_end(employee)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
+
+    def saved(self, employee):
+        """Apunta la versión después de que este proceso haya guardado sus propios cambios"""
+        # La lista en memoria ya tiene el cambio, así que no hace falta volver a leerla
+        with self._lock:
+            entry = self._entries.get(employee)
+            if entry is not None:
+                entry.version = self.storage.task_version(employee)
+
+    def invalidate(self, employee=None):
+        """Olvida las tareas de un empleado (o de todos) para que se vuelvan a leer"""
+        with self._lock:
+            if employee is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(employee, None)
+
+    def __contains__(self, employee):
+        return employee in self._entries
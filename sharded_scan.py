@@ -0,0 +1,58 @@
+"""Búsqueda de tareas que vencen repartida entre varios procesos.
+
+Con decenas de miles de empleados en archivos .json, leer y filtrar todos los
+archivos es trabajo de CPU (análisis del JSON y de las fechas) que un solo
+proceso no puede acelerar. ShardedScan reparte la lista de empleados en grupos,
+cada proceso lee y filtra los archivos de su grupo y solo devuelve al proceso
+principal las tareas que vencen, que son las que hay que enviar.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from storage import JsonStorage
+
+
+def _scan_shard(employee_file, tasks_dir, employees, first_ordinal, last_ordinal, status):
+    """Lee los archivos de un grupo de empleados y devuelve las tareas que vencen"""
+    #OUTPUT
+    #-Devuelve una lista de pares (empleado, tarea)
+    storage = JsonStorage(employee_file, tasks_dir)
+    due = []
+    for employee in employees:
+        for task in storage.load_tasks(employee):
+            if task.status == status and first_ordinal <= task.due_ordinal <= last_ordinal:
+                due.append((employee, task))
+    return due
+
+
+class ShardedScan:
+    """Sustituye a storage.iter_due_tasks leyendo los archivos en varios procesos."""
+
+    def __init__(self, workers=None, shards_per_worker=4):
+        self.workers = workers or os.cpu_count() or 1
+        # Varios grupos por proceso para que ninguno se quede esperando al más lento
+        self.shards_per_worker = shards_per_worker
+
+    def shards(self, employees):
+        """Divide la lista de empleados en grupos de tamaño parecido"""
+        count = min(len(employees), self.workers * self.shards_per_worker)
+        return [employees[i::count] for i in range(count)]
+
+    def __call__(self, storage, first_date, last_date, status='Pendiente'):
+        """Recorre las tareas con ese estado que vencen entre las dos fechas (incluidas)"""
+        #OUTPUT
+        #-Genera pares (empleado, tarea)
+        if not isinstance(storage, JsonStorage) or self.workers <= 1:
+            # SQLite ya filtra con su índice; no hay nada que repartir
+            yield from storage.iter_due_tasks(first_date, last_date, status)
+            return
+        employees = sorted(storage.load_employees())
+        shards = self.shards(employees)
+        if not shards:
+            return
+        first, last = first_date.toordinal(), last_date.toordinal()
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+            futures = [executor.submit(_scan_shard, storage.employee_file, storage.tasks_dir,
+                                       shard, first, last, status) for shard in shards]
+            for future in futures:
+                yield from future.result()
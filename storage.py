@@ -0,0 +1,681 @@
+"""Almacenamiento de empleados y tareas.
+
+Hay dos implementaciones con la misma interfaz:
+- JsonStorage: el formato de siempre, un archivo .json por empleado, más un
+  índice de tareas pendientes por día de vencimiento en la carpeta .due_index
+  (un archivo por día) para que el recordatorio no tenga que abrir todos.
+- SQLiteStorage: una única base de datos con índices por estado, fecha y
+  empleado. Cada cambio de una tarea se escribe en su propia fila.
+
+Las tareas se manejan como registros Task (models.py) y se guardan con las
+claves de siempre ('task', 'priority', 'due_date' en formato dd-mm-yy y 'status').
+
+Las rutas de la línea de comandos toman por defecto las de config.py.
+
+Para pasar del formato JSON a SQLite:
+    python storage.py migrate --employees ./info_empleados.json --tasks-dir . --db ./tareas.db
+
+Si se editan los archivos .json a mano, el índice se reconstruye con:
+    python storage.py reindex --employees ./info_empleados.json --tasks-dir .
+
+Para aplicar los diarios de cambios (.journal) a los archivos .json:
+    python storage.py compact --employees ./info_empleados.json --tasks-dir .
+"""
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import date, datetime, timedelta
+
+import metrics
+from models import Task
+from reminders import task_sort_key
+
+# os.umask solo se puede leer cambiándolo, así que se consulta una vez al cargar el módulo
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_mode(path):
+    """Permisos del archivo si ya existe o los que tendría uno nuevo creado con open()"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+class JsonStorage:
+    """Un archivo con los empleados y un archivo .json de tareas por empleado.
+
+    Cada cambio individual (añadir, completar o eliminar una tarea, añadir un
+    empleado) se añade como una línea al diario del archivo (`<archivo>.journal`)
+    y se fuerza a disco en ese momento. Al leer, el diario se aplica sobre el
+    último archivo completo, así que tras un corte no se pierde nada. Cuando el
+    diario llega a `journal_limit` cambios se compacta: se reescribe el archivo
+    completo y se vacía el diario. Los archivos completos se escriben siempre en
+    un temporal que luego se renombra, de modo que nunca quedan a medias.
+    """
+
+    def __init__(self, employee_file, tasks_dir='.', compact=False, journal_limit=100):
+        self.employee_file = employee_file
+        self.tasks_dir = tasks_dir
+        self.compact = compact  # Sin sangría: archivos más pequeños y rápidos de escribir
+        self.journal_limit = journal_limit
+        self._journal_lines = {}  # Ruta del diario -> cambios que contiene
+        self._torn_journals = set()  # Diarios cuya última línea quedó a medias
+        self._next_ids = {}  # Empleado -> siguiente identificador de tarea
+
+    def task_file(self, employee):
+        """Ruta del archivo de tareas del empleado"""
+        return os.path.join(self.tasks_dir, f'{employee}.json')
+
+    @staticmethod
+    def journal_file(path):
+        """Ruta del diario de cambios de un archivo"""
+        return f'{path}.journal'
+
+    # ---------------- Escritura atómica y diario ----------------
+
+    def _write_json(self, path, data, compact=None):
+        """Escribe el archivo en un temporal y lo renombra, así nunca queda a medias"""
+        compact = self.compact if compact is None else compact
+        directory = os.path.dirname(path) or '.'
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix='.tmp-', suffix='.json', delete=False) as file:
+            try:
+                if compact:
+                    json.dump(data, file, separators=(',', ':'))
+                else:
+                    json.dump(data, file, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        # El temporal se crea con 0600: sin esto cron o las copias de seguridad con otro usuario no podrían leerlo
+        os.chmod(file.name, file_mode(path))
+        os.replace(file.name, path)
+
+    def _read_journal(self, path):
+        """Lee los cambios del diario"""
+        #OUTPUT
+        #-Devuelve una lista de cambios; se saltan las líneas que un corte dejó a medias
+        try:
+            with open(path, 'r') as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            self._journal_lines[path] = 0
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        self._journal_lines[path] = len(entries)
+        if lines and not lines[-1].endswith('\n'):
+            self._torn_journals.add(path)
+        return entries
+
+    def _append_journal(self, path, entries):
+        """Añade cambios al diario y los fuerza a disco"""
+        #OUTPUT
+        #-Devuelve True si el diario ha llegado al límite y conviene compactarlo
+        if path not in self._journal_lines:
+            self._read_journal(path)
+        lines = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        if path in self._torn_journals:
+            lines = '\n' + lines  # Que la línea incompleta no estropee la siguiente
+            self._torn_journals.discard(path)
+        with open(path, 'a') as file:
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        self._journal_lines[path] += len(entries)
+        return self._journal_lines[path] >= self.journal_limit
+
+    def _clear_journal(self, path):
+        """Vacía el diario después de escribir el archivo completo"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self._journal_lines[path] = 0
+        self._torn_journals.discard(path)
+
+    # ---------------- Empleados ----------------
+
+    def load_employees(self):
+        """Abre el archivo.json donde se encuentran los empleados y sus correos"""
+        try:
+            with open(self.employee_file, 'r') as file:
+                employees = json.load(file)
+        except FileNotFoundError:
+            self._write_json(self.employee_file, {})
+            employees = {}
+        for entry in self._read_journal(self.journal_file(self.employee_file)):
+            employees[entry['name']] = entry['email']
+        return employees
+
+    def save_employees(self, employees):
+        """Guarda el archivo con los empleados"""
+        self._write_json(self.employee_file, employees)
+        self._clear_journal(self.journal_file(self.employee_file))
+        self._mark_changed()
+
+    def add_employee(self, name, email):
+        """Añade o actualiza un empleado escribiendo solo una línea en el diario"""
+        if self._append_journal(self.journal_file(self.employee_file), [{'op': 'set', 'name': name, 'email': email}]):
+            self.save_employees(self.load_employees())
+        else:
+            self._mark_changed()
+
+    def sync_employees(self, employees):
+        """Los cambios ya están en el diario; solo se compacta si ha crecido"""
+        if self._journal_lines.get(self.journal_file(self.employee_file), 0) >= self.journal_limit:
+            self.save_employees(self.load_employees())
+
+    def merge_employees(self, employees):
+        """Añade o actualiza varios empleados y los guarda en una sola escritura"""
+        current = self.load_employees()
+        current.update(employees)
+        self.save_employees(current)
+
+    # ---------------- Tareas ----------------
+
+    def load_tasks(self, employee):
+        """Abre el archivo.json donde se encuentran las tareas"""
+        #OUTPUT
+        #-Devuelve una lista de Task con las fechas ya convertidas y los cambios del diario aplicados
+        with metrics.timer('read_tasks_seconds'):
+            rows = self._read_task_file(employee)
+        with metrics.timer('parse_tasks_seconds'):
+            tasks = [Task.from_dict(data) for data in rows]
+        # Las tareas de archivos antiguos no tienen identificador: se numeran en orden
+        next_id = max((task.id for task in tasks if task.id is not None), default=0) + 1
+        for task in tasks:
+            if task.id is None:
+                task.id = next_id
+                next_id += 1
+        entries = self._read_journal(self.journal_file(self.task_file(employee)))
+        if entries:
+            by_id = {task.id: task for task in tasks}
+            for entry in entries:
+                # Aplicar un cambio dos veces no tiene efecto, por si se repite tras un corte
+                if entry['op'] == 'add':
+                    task = Task.from_dict(entry['task'])
+                    by_id.setdefault(task.id, task)
+                    next_id = max(next_id, task.id + 1)
+                elif entry['op'] == 'update' and entry['id'] in by_id:
+                    by_id[entry['id']].status = entry['status']
+                elif entry['op'] == 'delete':
+                    by_id.pop(entry['id'], None)
+            tasks = list(by_id.values())
+        self._next_ids[employee] = next_id
+        metrics.inc('tasks_loaded', len(tasks))
+        return tasks
+
+    def _read_task_file(self, employee):
+        task_file = self.task_file(employee)
+        try:
+            with open(task_file, 'r') as file:
+                metrics.inc('files_read')
+                return json.load(file)
+        except FileNotFoundError:
+            self._write_json(task_file, [])
+            return []
+
+    def save_tasks(self, employee, tasks):
+        """Guarda las tareas en el archivo.json"""
+        indexed = self._index_built()
+        if indexed:
+            # Las tareas que había antes indican qué días del índice hay que revisar
+            old_tasks = self.load_tasks(employee)
+        self._write_json(self.task_file(employee), [task.to_dict() for task in tasks])
+        self._clear_journal(self.journal_file(self.task_file(employee)))
+        self._next_ids.pop(employee, None)
+        if indexed:
+            self._update_due_index(employee, old_tasks, tasks)
+        self._mark_changed()
+
+    def compact_tasks(self, employee):
+        """Reescribe el archivo de tareas con los cambios del diario y lo vacía"""
+        tasks = self.load_tasks(employee)
+        self._write_json(self.task_file(employee), [task.to_dict() for task in tasks])
+        self._clear_journal(self.journal_file(self.task_file(employee)))
+
+    def _log_tasks(self, employee, entries):
+        """Apunta los cambios de tareas en el diario del empleado"""
+        if self._append_journal(self.journal_file(self.task_file(employee)), entries):
+            self.compact_tasks(employee)
+        self._mark_changed()
+
+    def _new_id(self, employee):
+        if employee not in self._next_ids:
+            self.load_tasks(employee)
+        task_id = self._next_ids[employee]
+        self._next_ids[employee] = task_id + 1
+        return task_id
+
+    def add_task(self, employee, task):
+        """Registra una tarea nueva y le asigna su identificador"""
+        task.id = self._new_id(employee)
+        self._log_tasks(employee, [{'op': 'add', 'task': task.to_dict()}])
+        self._index_task(employee, task)
+        return task
+
+    def add_tasks(self, employee, tasks):
+        """Registra varias tareas nuevas con una sola escritura del diario"""
+        for task in tasks:
+            task.id = self._new_id(employee)
+        self._log_tasks(employee, [{'op': 'add', 'task': task.to_dict()} for task in tasks])
+        for task in tasks:
+            self._index_task(employee, task)
+
+    def update_task(self, employee, task):
+        """Registra el cambio de estado de una tarea"""
+        self._log_tasks(employee, [{'op': 'update', 'id': task.id, 'status': task.status}])
+        self._index_task(employee, task)
+
+    def delete_task(self, employee, task):
+        """Registra la eliminación de una tarea"""
+        self._log_tasks(employee, [{'op': 'delete', 'id': task.id}])
+        self._index_task(employee, task, deleted=True)
+
+    def sync_tasks(self, employee, tasks):
+        """Los cambios ya están en el diario; solo se compacta si ha crecido"""
+        if self._journal_lines.get(self.journal_file(self.task_file(employee)), 0) >= self.journal_limit:
+            self.compact_tasks(employee)
+
+    def merge_tasks(self, employee, tasks):
+        """Añade varias tareas ordenadas al archivo del empleado en una sola escritura"""
+        current = self.load_tasks(employee)
+        current.sort(key=task_sort_key)
+        next_id = self._next_ids[employee]
+        for task in tasks:
+            task.id = next_id
+            next_id += 1
+        self.save_tasks(employee, list(heapq.merge(current, tasks, key=task_sort_key)))
+
+    def iter_due_tasks(self, first_date, last_date, status='Pendiente'):
+        """Recorre las tareas con ese estado que vencen entre las dos fechas (incluidas)"""
+        #OUTPUT
+        #-Genera pares (empleado, tarea)
+        if status != 'Pendiente':  # El índice solo guarda las tareas pendientes
+            yield from self._scan_due_tasks(first_date, last_date, status)
+            return
+        if not self._index_built():
+            self.rebuild_due_index()
+        day = first_date
+        while day <= last_date:
+            # Solo se leen los archivos del índice de los días de la ventana
+            bucket = self._read_index_file(f'{day.isoformat()}.json')
+            for employee, tasks in sorted(bucket.items()):
+                metrics.inc('tasks_scanned', len(tasks))
+                for data in tasks:
+                    yield employee, Task.from_dict(data)
+            day += timedelta(days=1)
+
+    def _scan_due_tasks(self, first_date, last_date, status):
+        first, last = first_date.toordinal(), last_date.toordinal()
+        for employee in self.load_employees():
+            tasks = self.load_tasks(employee)
+            metrics.inc('tasks_scanned', len(tasks))
+            for task in tasks:
+                if task.status == status and first <= task.due_ordinal <= last:
+                    yield employee, task
+
+    # ---------------- Índice de tareas pendientes por día ----------------
+
+    def _index_path(self, name):
+        return os.path.join(self.tasks_dir, '.due_index', name)
+
+    def _index_built(self):
+        return os.path.exists(self._index_path('_built'))
+
+    def _read_index_file(self, name):
+        try:
+            with open(self._index_path(name), 'r') as file:
+                metrics.inc('files_read')
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _write_index_file(self, name, bucket):
+        path = self._index_path(name)
+        if not bucket:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        self._write_json(path, bucket, compact=True)
+
+    @staticmethod
+    def _pending_by_day(tasks):
+        """Agrupa las tareas pendientes por día de vencimiento (yyyy-mm-dd)"""
+        days = {}
+        for task in tasks:
+            if task.status == 'Pendiente':
+                days.setdefault(task.due_ordinal, []).append(task.to_dict())
+        return {date.fromordinal(day).isoformat(): day_tasks for day, day_tasks in days.items()}
+
+    def _update_due_index(self, employee, old_tasks, new_tasks):
+        """Actualiza solo los días del índice en los que cambian las tareas del empleado"""
+        old_days = self._pending_by_day(old_tasks)
+        new_days = self._pending_by_day(new_tasks)
+        for day in old_days.keys() | new_days.keys():
+            if old_days.get(day) == new_days.get(day):
+                continue
+            bucket = self._read_index_file(f'{day}.json')
+            if day in new_days:
+                bucket[employee] = new_days[day]
+            else:
+                bucket.pop(employee, None)
+            self._write_index_file(f'{day}.json', bucket)
+
+    def _index_task(self, employee, task, deleted=False):
+        """Actualiza en el índice solo el día de vencimiento de una tarea"""
+        if not self._index_built():
+            return
+        name = f'{task.due_date.isoformat()}.json'
+        bucket = self._read_index_file(name)
+
+        def same_task(data):
+            if 'id' in data:
+                return data['id'] == task.id
+            # Índices creados antes de que las tareas tuvieran identificador
+            return (data['task'], str(data['priority'])) == (task.name, str(task.priority))
+
+        tasks = [data for data in bucket.get(employee, []) if not same_task(data)]
+        if not deleted and task.status == 'Pendiente':
+            tasks.append(task.to_dict())
+        if tasks:
+            bucket[employee] = tasks
+        else:
+            bucket.pop(employee, None)
+        self._write_index_file(name, bucket)
+
+    def rebuild_due_index(self):
+        """Reconstruye el índice completo leyendo todos los archivos de tareas"""
+        index_dir = self._index_path('')
+        os.makedirs(index_dir, exist_ok=True)
+        for name in os.listdir(index_dir):
+            os.remove(os.path.join(index_dir, name))
+        buckets = {}
+        for employee in self.load_employees():
+            for day, tasks in self._pending_by_day(self.load_tasks(employee)).items():
+                buckets.setdefault(day, {})[employee] = tasks
+        for day, bucket in buckets.items():
+            self._write_index_file(f'{day}.json', bucket)
+        # Marca que el índice está completo y se puede usar
+        with open(self._index_path('_built'), 'w') as file:
+            file.write(datetime.now().isoformat())
+        self._mark_changed()
+
+    def _mark_changed(self):
+        # La fecha de modificación de este archivo es la del último cambio guardado
+        os.makedirs(self._index_path(''), exist_ok=True)
+        with open(self._index_path('_changed'), 'w') as file:
+            file.write(datetime.now().isoformat())
+
+    def task_versions(self):
+        """Devuelve {empleado: versión}; la versión cambia cada vez que cambian sus tareas"""
+        #OUTPUT
+        #-La versión son la fecha de modificación y el tamaño del archivo y de su diario
+        return {employee: self.task_version(employee) for employee in self.load_employees()}
+
+    def task_version(self, employee):
+        """Versión de las tareas de un empleado; cambia cada vez que se guardan"""
+        task_file = self.task_file(employee)
+        return self._file_version(task_file), self._file_version(self.journal_file(task_file))
+
+    @staticmethod
+    def _file_version(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def last_modified(self):
+        """Hora del último cambio guardado en empleados o tareas"""
+        #OUTPUT
+        #-Devuelve None si no se conoce
+        try:
+            return datetime.fromtimestamp(os.path.getmtime(self._index_path('_changed')))
+        except FileNotFoundError:
+            return None
+
+    def clone(self):
+        """Devuelve un almacenamiento que se puede usar desde otro hilo"""
+        return self
+
+    def close(self):
+        """No hay nada que cerrar"""
+
+
+class SQLiteStorage:
+    """Empleados y tareas en una única base de datos SQLite."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS employees (
+            name TEXT PRIMARY KEY,
+            email TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            employee TEXT NOT NULL,
+            task TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            due_date TEXT NOT NULL,
+            status TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks (status, due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_employee ON tasks (employee, due_date, priority);
+
+        -- Versión de las tareas de cada empleado, para detectar cambios sin leerlas
+        CREATE TABLE IF NOT EXISTS task_versions (
+            employee TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS tasks_version_insert AFTER INSERT ON tasks BEGIN
+            INSERT OR IGNORE INTO task_versions (employee, version) VALUES (NEW.employee, 0);
+            UPDATE task_versions SET version = version + 1 WHERE employee = NEW.employee;
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_version_update AFTER UPDATE ON tasks BEGIN
+            INSERT OR IGNORE INTO task_versions (employee, version) VALUES (NEW.employee, 0);
+            UPDATE task_versions SET version = version + 1 WHERE employee IN (OLD.employee, NEW.employee);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_version_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_versions SET version = version + 1 WHERE employee = OLD.employee;
+        END;
+    """
+
+    def __init__(self, database_file):
+        self.database_file = database_file
+        self.conn = sqlite3.connect(database_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _row_to_task(row):
+        return Task(row['task'], row['priority'], date.fromisoformat(row['due_date']).toordinal(),
+                    row['status'], row['id'])
+
+    @staticmethod
+    def _task_params(employee, task):
+        return (employee, task.name, task.priority, task.due_date.isoformat(), task.status)
+
+    def load_employees(self):
+        """Devuelve un diccionario con los empleados y sus correos"""
+        return {row['name']: row['email'] for row in self.conn.execute('SELECT name, email FROM employees ORDER BY rowid')}
+
+    def save_employees(self, employees):
+        """Sustituye todos los empleados por los del diccionario"""
+        with self.conn:
+            self.conn.execute('DELETE FROM employees')
+            self.conn.executemany('INSERT INTO employees (name, email) VALUES (?, ?)', employees.items())
+
+    def add_employee(self, name, email):
+        """Añade o actualiza un empleado"""
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO employees (name, email) VALUES (?, ?)', (name, email))
+
+    def sync_employees(self, employees):
+        """Cada empleado ya se guarda al añadirlo"""
+
+    def merge_employees(self, employees):
+        """Añade o actualiza varios empleados en una sola transacción"""
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO employees (name, email) VALUES (?, ?)', employees.items())
+
+    def load_tasks(self, employee):
+        """Devuelve la lista de tareas del empleado ordenada por fecha y prioridad"""
+        with metrics.timer('read_tasks_seconds'):
+            rows = self.conn.execute('SELECT * FROM tasks WHERE employee = ? ORDER BY due_date, priority, id',
+                                     (employee,)).fetchall()
+        with metrics.timer('parse_tasks_seconds'):
+            tasks = [self._row_to_task(row) for row in rows]
+        metrics.inc('tasks_loaded', len(tasks))
+        return tasks
+
+    def save_tasks(self, employee, tasks):
+        """Sustituye todas las tareas del empleado"""
+        with self.conn:
+            self.conn.execute('DELETE FROM tasks WHERE employee = ?', (employee,))
+            self.add_tasks(employee, tasks)
+
+    def add_task(self, employee, task):
+        """Inserta una tarea y le asigna su identificador"""
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO tasks (employee, task, priority, due_date, status) VALUES (?, ?, ?, ?, ?)',
+                self._task_params(employee, task))
+        task.id = cursor.lastrowid
+        return task
+
+    def add_tasks(self, employee, tasks):
+        """Inserta varias tareas en una sola transacción"""
+        with self.conn:
+            for task in tasks:
+                cursor = self.conn.execute(
+                    'INSERT INTO tasks (employee, task, priority, due_date, status) VALUES (?, ?, ?, ?, ?)',
+                    self._task_params(employee, task))
+                task.id = cursor.lastrowid
+
+    def update_task(self, employee, task):
+        """Actualiza solo la fila de la tarea"""
+        with self.conn:
+            self.conn.execute(
+                'UPDATE tasks SET task = ?, priority = ?, due_date = ?, status = ? WHERE id = ? AND employee = ?',
+                self._task_params(employee, task)[1:] + (task.id, employee))
+
+    def delete_task(self, employee, task):
+        """Elimina solo la fila de la tarea"""
+        with self.conn:
+            self.conn.execute('DELETE FROM tasks WHERE id = ? AND employee = ?', (task.id, employee))
+
+    def sync_tasks(self, employee, tasks):
+        """Cada cambio ya se escribe en el momento en que se hace"""
+
+    def merge_tasks(self, employee, tasks):
+        """Añade varias tareas en una sola transacción"""
+        self.add_tasks(employee, tasks)
+
+    def iter_due_tasks(self, first_date, last_date, status='Pendiente'):
+        """Recorre las tareas con ese estado que vencen entre las dos fechas (incluidas)"""
+        #OUTPUT
+        #-Genera pares (empleado, tarea) usando el índice (status, due_date)
+        rows = self.conn.execute(
+            'SELECT * FROM tasks WHERE status = ? AND due_date BETWEEN ? AND ? ORDER BY employee, due_date, priority, id',
+            (status, first_date.isoformat(), last_date.isoformat()))
+        for row in rows:
+            metrics.inc('tasks_scanned')
+            yield row['employee'], self._row_to_task(row)
+
+    def task_versions(self):
+        """Devuelve {empleado: versión}; la versión cambia cada vez que cambian sus tareas"""
+        return {row['employee']: row['version'] for row in self.conn.execute('SELECT employee, version FROM task_versions')}
+
+    def task_version(self, employee):
+        """Versión de las tareas de un empleado; cambia cada vez que se guardan"""
+        row = self.conn.execute('SELECT version FROM task_versions WHERE employee = ?', (employee,)).fetchone()
+        return row['version'] if row else None
+
+    def last_modified(self):
+        """Hora del último cambio guardado en la base de datos"""
+        #OUTPUT
+        #-Devuelve None si no se conoce
+        if self.database_file == ':memory:':
+            return None
+        return datetime.fromtimestamp(os.path.getmtime(self.database_file))
+
+    def clone(self):
+        """Abre otra conexión para usarla desde otro hilo"""
+        return SQLiteStorage(self.database_file)
+
+    def close(self):
+        """Cierra la conexión con la base de datos"""
+        self.conn.close()
+
+
+def open_storage(backend, employee_file, database_file, tasks_dir='.', compact=False, journal_limit=100):
+    """Crea el almacenamiento indicado en la configuración ('json' o 'sqlite')"""
+    #INPUT
+    #-compact, journal_limit: opciones de JsonStorage (formato sin sangría y tamaño del diario)
+    if backend == 'sqlite':
+        return SQLiteStorage(database_file)
+    if backend == 'json':
+        return JsonStorage(employee_file, tasks_dir, compact, journal_limit)
+    raise ValueError(f'Tipo de almacenamiento desconocido: {backend}')
+
+
+def migrate_json_to_sqlite(source, target):
+    """Copia todos los empleados y tareas de un JsonStorage a un SQLiteStorage"""
+    #OUTPUT
+    #-Devuelve el número de empleados y de tareas copiadas
+    employees = source.load_employees()
+    target.save_employees(employees)
+    total_tasks = 0
+    for employee in employees:
+        tasks = sorted(source.load_tasks(employee), key=task_sort_key)
+        target.save_tasks(employee, tasks)
+        total_tasks += len(tasks)
+    return len(employees), total_tasks
+
+
+if __name__ == '__main__':
+    import config
+
+    parser = argparse.ArgumentParser(description='Herramientas de almacenamiento de empleados y tareas')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate = subparsers.add_parser('migrate', help='Pasa los archivos .json a una base de datos SQLite')
+    migrate.add_argument('--employees', default=config.EMPLOYEE_FILE, help='Archivo .json de empleados')
+    migrate.add_argument('--tasks-dir', default=config.TASKS_DIR, help='Carpeta con los archivos .json de tareas')
+    migrate.add_argument('--db', default=config.DATABASE_FILE, help='Base de datos SQLite de destino')
+    reindex = subparsers.add_parser('reindex', help='Reconstruye el índice de vencimientos de los archivos .json')
+    reindex.add_argument('--employees', default=config.EMPLOYEE_FILE, help='Archivo .json de empleados')
+    reindex.add_argument('--tasks-dir', default=config.TASKS_DIR, help='Carpeta con los archivos .json de tareas')
+    compact = subparsers.add_parser('compact', help='Aplica los diarios de cambios a los archivos .json')
+    compact.add_argument('--employees', default=config.EMPLOYEE_FILE, help='Archivo .json de empleados')
+    compact.add_argument('--tasks-dir', default=config.TASKS_DIR, help='Carpeta con los archivos .json de tareas')
+    compact.add_argument('--compact-json', action='store_true', default=config.COMPACT_JSON,
+                         help='Escribe los archivos sin sangría')
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        target = SQLiteStorage(args.db)
+        n_employees, n_tasks = migrate_json_to_sqlite(JsonStorage(args.employees, args.tasks_dir), target)
+        target.close()
+        print(f'Migrados {n_employees} empleados y {n_tasks} tareas a {args.db}')
+    elif args.command == 'reindex':
+        JsonStorage(args.employees, args.tasks_dir).rebuild_due_index()
+        print('Índice de vencimientos reconstruido')
+    elif args.command == 'compact':
+        storage = JsonStorage(args.employees, args.tasks_dir, args.compact_json, config.JOURNAL_LIMIT)
+        employees = storage.load_employees()
+        storage.save_employees(employees)
+        for employee in employees:
+            storage.compact_tasks(employee)
+        print(f'Compactados {len(employees)} archivos de tareas')
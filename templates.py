@@ -0,0 +1,171 @@
+"""Plantillas de los correos de recordatorio.
+
+Una plantilla se compila una vez por ejecución a partir de la configuración:
+los textos del idioma elegido se preparan, las cabeceras comunes (remitente,
+asunto, tipo de contenido) se codifican a bytes una sola vez y cada correo se
+obtiene pegando la cabecera del destinatario y el cuerpo ya codificado. El
+resultado son los bytes listos para smtplib.sendmail, sin construir objetos
+MIME por cada correo.
+
+Idiomas disponibles: 'es' (por defecto), 'ca' y 'en'. Con 'html': True en la
+configuración el correo lleva también una versión HTML del mismo texto.
+"""
+import base64
+import html
+import secrets
+import time
+from email.header import Header
+from email.utils import formatdate
+
+LOCALES = {
+    'es': {
+        'subject': 'Recordatorio de tarea',
+        'single': "Hola, recuerda que la tarea '{name}' vence el {due}.",
+        'digest': 'Hola, recuerda que tienes {count} tareas a punto de vencer:',
+        'line': "- '{name}' (prioridad {priority}) vence el {due}.",
+        'overdue_single': "Hola, la tarea '{name}' venció el {due} y sigue pendiente.",
+        'overdue_digest': 'Hola, tienes {count} tareas vencidas que siguen pendientes:',
+        'overdue_line': "- '{name}' (prioridad {priority}) venció el {due}.",
+        'escalation_single': "La tarea '{name}' de {employee} venció el {due} y sigue pendiente.",
+        'escalation_digest': '{employee} tiene {count} tareas vencidas que siguen pendientes:',
+        'escalation_line': "- '{name}' (prioridad {priority}) venció el {due}.",
+    },
+    'ca': {
+        'subject': 'Recordatori de tasca',
+        'single': "Hola, recorda que la tasca '{name}' venç el {due}.",
+        'digest': 'Hola, recorda que tens {count} tasques a punt de vèncer:',
+        'line': "- '{name}' (prioritat {priority}) venç el {due}.",
+        'overdue_single': "Hola, la tasca '{name}' va vèncer el {due} i encara està pendent.",
+        'overdue_digest': 'Hola, tens {count} tasques vençudes que encara estan pendents:',
+        'overdue_line': "- '{name}' (prioritat {priority}) va vèncer el {due}.",
+        'escalation_single': "La tasca '{name}' de {employee} va vèncer el {due} i encara està pendent.",
+        'escalation_digest': '{employee} té {count} tasques vençudes que encara estan pendents:',
+        'escalation_line': "- '{name}' (prioritat {priority}) va vèncer el {due}.",
+    },
+    'en': {
+        'subject': 'Task reminder',
+        'single': "Hi, remember that the task '{name}' is due on {due}.",
+        'digest': 'Hi, remember that you have {count} tasks about to be due:',
+        'line': "- '{name}' (priority {priority}) is due on {due}.",
+        'overdue_single': "Hi, the task '{name}' was due on {due} and is still pending.",
+        'overdue_digest': 'Hi, you have {count} overdue tasks that are still pending:',
+        'overdue_line': "- '{name}' (priority {priority}) was due on {due}.",
+        'escalation_single': "The task '{name}' assigned to {employee} was due on {due} and is still pending.",
+        'escalation_digest': '{employee} has {count} overdue tasks that are still pending:',
+        'escalation_line': "- '{name}' (priority {priority}) was due on {due}.",
+    },
+}
+
+# Longitud máxima de una línea sin codificar según el RFC 5322
+MAX_LINE = 998
+
+
+def check_address(address):
+    """Lanza ValueError si la dirección no se puede poner tal cual en la cabecera To"""
+    # Un salto de línea permitiría añadir cabeceras (p. ej. Bcc) y smtplib no envía direcciones no ASCII
+    if not address or '\r' in address or '\n' in address or not address.isascii():
+        raise ValueError(f'Dirección de correo no válida: {address!r}')
+
+
+class MessageBody(str):
+    """Texto del correo que, si la plantilla lo pide, lleva también su versión HTML."""
+
+    __slots__ = ('html',)
+
+    def __new__(cls, text, html_text=None):
+        body = super().__new__(cls, text)
+        body.html = html_text
+        return body
+
+
+def _encode_part(text, subtype):
+    """Cabeceras y contenido de una parte de texto, ya en bytes"""
+    if text.isascii() and all(len(line) <= MAX_LINE for line in text.split('\n')):
+        return (f'Content-Type: text/{subtype}; charset="us-ascii"\r\n'
+                f'Content-Transfer-Encoding: 7bit\r\n\r\n').encode() + text.replace('\n', '\r\n').encode()
+    return (f'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            f'Content-Transfer-Encoding: base64\r\n\r\n').encode() + \
+        base64.encodebytes(text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+
+class MessageTemplate:
+    """Textos de un idioma y cabeceras comunes ya codificadas."""
+
+    def __init__(self, from_email, subject=None, language='es', html_body=False):
+        if language not in LOCALES:
+            raise ValueError(f'Idioma no disponible: {language} ({", ".join(LOCALES)})')
+        self.texts = LOCALES[language]
+        self.from_email = from_email
+        self.html_body = html_body
+        subject = subject or self.texts['subject']
+        if not subject.isascii():
+            subject = Header(subject, 'utf-8').encode()
+        # El destinatario y la fecha van entre estas dos partes
+        self._head = f'From: {from_email}\r\n'.encode()
+        self._tail = f'Subject: {subject}\r\nMIME-Version: 1.0\r\n'.encode()
+        if html_body:
+            self._boundary = f'=============={secrets.token_hex(12)}=='
+            self._tail += f'Content-Type: multipart/alternative; boundary="{self._boundary}"\r\n\r\n'.encode()
+        self._date = (0, b'')
+
+    # ---------------- Textos ----------------
+
+    def digest_body(self, tasks):
+        """Mensaje con todas las tareas de un empleado, ordenadas por fecha y prioridad"""
+        return self._body('', tasks)
+
+    def overdue_body(self, tasks):
+        """Mensaje para el empleado con sus tareas vencidas que siguen pendientes"""
+        return self._body('overdue_', tasks)
+
+    def escalation_body(self, employee, tasks):
+        """Mensaje para el responsable con las tareas vencidas de un empleado"""
+        return self._body('escalation_', tasks, employee=employee)
+
+    def _body(self, prefix, tasks, **fields):
+        # prefix elige los textos: '' (a punto de vencer), 'overdue_' o 'escalation_'
+        if len(tasks) == 1:
+            text = self.texts[prefix + 'single'].format(name=tasks[0].name, due=tasks[0].due_str, **fields)
+            if not self.html_body:
+                return text
+            return MessageBody(text, f'<p>{html.escape(text)}</p>')
+        header = self.texts[prefix + 'digest'].format(count=len(tasks), **fields)
+        lines = [self.texts[prefix + 'line'].format(name=task.name, priority=task.priority, due=task.due_str)
+                 for task in sorted(tasks, key=lambda task: task.sort_key)]
+        text = '\n'.join([header] + lines)
+        if not self.html_body:
+            return text
+        items = ''.join(f'<li>{html.escape(line[2:])}</li>' for line in lines)
+        return MessageBody(text, f'<p>{html.escape(header)}</p><ul>{items}</ul>')
+
+    # ---------------- Correo en bytes ----------------
+
+    def _date_header(self):
+        # La fecha solo se vuelve a formatear cuando cambia el segundo
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, f'Date: {formatdate(now, localtime=True)}\r\n'.encode())
+        return self._date[1]
+
+    def render(self, to_email, body):
+        """Devuelve el correo completo en bytes, listo para sendmail"""
+        #INPUT
+        #-body: texto del mensaje (str o MessageBody con su versión HTML)
+        check_address(to_email)
+        head = self._head + f'To: {to_email}\r\n'.encode() + self._date_header() + self._tail
+        if not self.html_body:
+            return head + _encode_part(body, 'plain')
+        html_text = getattr(body, 'html', None) or f'<p>{html.escape(body)}</p>'.replace('\n', '<br>\n')
+        separator = f'\r\n--{self._boundary}\r\n'.encode()
+        return (head + separator[2:] + _encode_part(body, 'plain') + separator + _encode_part(html_text, 'html')
+                + f'\r\n--{self._boundary}--\r\n'.encode())
+
+
+def compile_template(config):
+    """Compila la plantilla de los correos a partir de la configuración de correo"""
+    return MessageTemplate(config['from_email'], config.get('subject'), config.get('language', 'es'),
+                           config.get('html', False))
+
+
+# Plantilla por defecto (español, solo texto) para preparar mensajes sin configuración
+DEFAULT_TEMPLATE = MessageTemplate('')
@@ -0,0 +1,34 @@
+"""Importación masiva: las filas con errores se indican y no detienen la importación."""
+import json
+
+from bulk_io import import_employees, import_tasks
+from storage import JsonStorage
+
+
+def write_jsonl(path, rows):
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows), encoding='utf-8')
+    return str(path)
+
+
+def test_non_text_values_are_reported_per_line(tmp_path):
+    storage = JsonStorage(str(tmp_path / 'empleados.json'), str(tmp_path))
+    errors = []
+    on_error = lambda line_number, message: errors.append(line_number)
+
+    employees = write_jsonl(tmp_path / 'e.jsonl', [{'name': 'ana', 'email': 'ana@x'},
+                                                   {'name': 123, 'email': 'b@x.com'},
+                                                   {'name': 'carla', 'email': ['c@x']},
+                                                   {'name': 'dani', 'email': 'dani@x'}])
+    assert import_employees(employees, storage, batch_size=1, on_error=on_error) == (2, 2)
+    assert errors == [2, 3]
+    assert storage.load_employees() == {'ana': 'ana@x', 'dani': 'dani@x'}
+
+    errors.clear()
+    tasks = write_jsonl(tmp_path / 't.jsonl', [{'employee': 'ana', 'task': 42, 'priority': 1, 'due_date': '01-02-30'},
+                                               {'employee': 'ana', 'task': 'informe', 'priority': 1,
+                                                'due_date': '01-02-30', 'status': 1},
+                                               {'employee': 'dani', 'task': 'revisión', 'priority': '2',
+                                                'due_date': '02-02-30'}])
+    assert import_tasks(tasks, storage, batch_size=1, on_error=on_error) == (1, 2)
+    assert errors == [1, 2]
+    assert [task.name for task in storage.load_tasks('dani')] == ['revisión']
@@ -0,0 +1,212 @@
+"""Diario de JsonStorage y ventanas/marca de la última ejecución del recordatorio."""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from core import EmployeeManager, ReminderService, prepare_reminders
+from daemon import ReminderDaemon
+from ledger import NotificationLedger
+from models import Task
+from notifier import EmailNotifier, SendResult
+from policies import PolicyEngine
+from reminders import due_window
+from storage import JsonStorage
+
+NOW = datetime(2030, 1, 10, 9, 0)
+TODAY = NOW.date().toordinal()
+ONE_DAY = PolicyEngine.from_config([{'name': '1d', 'days_before': 1}])
+
+
+def open_json(tmp_path, journal_limit=100):
+    return JsonStorage(str(tmp_path / 'empleados.json'), str(tmp_path), journal_limit=journal_limit)
+
+
+def names(tasks):
+    return sorted((task.name, task.status) for task in tasks)
+
+
+# ---------------- Diario ----------------
+
+def test_crash_between_rewrite_and_journal_clear(tmp_path, monkeypatch):
+    storage = open_json(tmp_path)
+    storage.add_employee('ana', 'ana@x')
+    tasks = [storage.add_task('ana', Task(f't{i}', 1, TODAY + i)) for i in range(3)]
+    tasks[0].status = 'Completada'
+    storage.update_task('ana', tasks[0])
+    storage.delete_task('ana', tasks[1])
+
+    def crash(path):
+        raise RuntimeError('corte')
+
+    # El archivo completo se escribe pero el proceso muere antes de vaciar el diario
+    monkeypatch.setattr(storage, '_clear_journal', crash)
+    with pytest.raises(RuntimeError):
+        storage.compact_tasks('ana')
+    assert (tmp_path / 'ana.json.journal').exists()
+
+    # Al volver a abrir el diario se aplica otra vez sobre el archivo ya compactado sin duplicar nada
+    reopened = open_json(tmp_path)
+    expected = [('t0', 'Completada'), ('t2', 'Pendiente')]
+    assert names(reopened.load_tasks('ana')) == expected
+    reopened.add_task('ana', Task('t3', 2, TODAY + 3))
+    assert names(open_json(tmp_path).load_tasks('ana')) == expected + [('t3', 'Pendiente')]
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    storage = open_json(tmp_path)
+    storage.add_employee('ana', 'ana@x')
+    storage.add_task('ana', Task('t0', 1, TODAY))
+    storage.add_task('ana', Task('t1', 1, TODAY + 1))
+    with open(tmp_path / 'ana.json.journal', 'a') as file:
+        file.write('{"op": "add", "task": {"task": "a medi')  # Corte en mitad de una escritura
+
+    reopened = open_json(tmp_path)
+    assert names(reopened.load_tasks('ana')) == [('t0', 'Pendiente'), ('t1', 'Pendiente')]
+    # Lo que se apunta después no se pega a la línea rota
+    reopened.add_task('ana', Task('t2', 1, TODAY + 2))
+    assert [task.name for task in open_json(tmp_path).load_tasks('ana')] == ['t0', 't1', 't2']
+
+
+def test_journal_limit_compacts(tmp_path):
+    storage = open_json(tmp_path, journal_limit=3)
+    storage.add_employee('ana', 'ana@x')
+    for i in range(4):
+        storage.add_task('ana', Task(f't{i}', 1, TODAY + i))
+    assert len(open_json(tmp_path).load_tasks('ana')) == 4
+    with open(tmp_path / 'ana.json.journal') as file:
+        assert len(file.read().splitlines()) == 1
+
+
+# ---------------- Ventanas y marca de la última ejecución ----------------
+
+def test_due_window():
+    assert due_window(datetime(2030, 1, 10, 0, 0)) == (date(2030, 1, 10), date(2030, 1, 11))
+    assert due_window(NOW) == (date(2030, 1, 11), date(2030, 1, 11))
+    assert due_window(NOW, 7) == (date(2030, 1, 11), date(2030, 1, 17))
+
+
+class Runner:
+    """Ejecuta el recordatorio con una hora fija y apunta qué se ha enviado."""
+
+    def __init__(self, tmp_path, tasks):
+        self.storage = open_json(tmp_path)
+        self.storage.add_employee('ana', 'ana@x')
+        self.storage.save_tasks('ana', tasks)
+        # Los datos no cambian después de la primera ejecución salvo que el test lo indique
+        self.changed = NOW - timedelta(hours=1)
+        self.storage.last_modified = lambda: self.changed
+        self.ledger = NotificationLedger(str(tmp_path / 'recordatorios.db'))
+        self.sent = []
+
+    def run(self, run_at, policies=ONE_DAY, success=True):
+        reminder_run = prepare_reminders(self.storage, {'ana': 'ana@x'}, False, run_at, self.ledger,
+                                         policies=policies)
+        results = [SendResult(email, success) for email, _, _ in reminder_run.plan]
+        reminder_run.finish(results)
+        items = [(task.name, notice) for _, _, plan_items in reminder_run.plan for _, task, notice in plan_items]
+        if success:
+            self.sent += items
+        return items
+
+
+def test_watermark_sends_each_notice_once(tmp_path):
+    runner = Runner(tmp_path, [Task(f'+{i}', 1, TODAY + i) for i in range(1, 4)])
+    assert runner.run(NOW) == [('+1', '1d')]
+    assert runner.run(NOW + timedelta(minutes=5)) == []
+    assert runner.run(NOW + timedelta(days=1)) == [('+2', '1d')]
+    assert runner.run(datetime(2030, 1, 12, 0, 0)) == [('+3', '1d')]
+    assert sorted(runner.sent) == [('+1', '1d'), ('+2', '1d'), ('+3', '1d')]
+
+
+def test_watermark_catches_up_after_a_gap(tmp_path):
+    runner = Runner(tmp_path, [Task(f'+{i}', 1, TODAY + i) for i in range(1, 4)])
+    assert runner.run(NOW) == [('+1', '1d')]
+    # Sin ejecutar hasta las 00:00 del día 12: la ventana recoge todo lo que ha entrado mientras tanto
+    assert runner.run(datetime(2030, 1, 12, 0, 0)) == [('+2', '1d'), ('+3', '1d')]
+
+
+def test_watermark_rescans_after_changes_and_failures(tmp_path):
+    runner = Runner(tmp_path, [Task('+1', 1, TODAY + 1)])
+    assert runner.run(NOW, success=False) == [('+1', '1d')]
+    # El envío falló: la marca no avanza y se vuelve a intentar
+    assert runner.run(NOW + timedelta(minutes=5)) == [('+1', '1d')]
+
+    # Una tarea añadida después de la última ejecución en un día que ya estaba en la ventana
+    runner.storage.add_task('ana', Task('nueva', 2, TODAY + 1))
+    runner.changed = NOW + timedelta(minutes=7)
+    assert runner.run(NOW + timedelta(minutes=10)) == [('nueva', '1d')]
+
+
+def test_tasks_with_the_same_name_are_reminded_separately(tmp_path):
+    runner = Runner(tmp_path, [Task('Informe', 1, TODAY + 1)])
+    assert runner.run(NOW) == [('Informe', '1d')]
+    runner.storage.add_task('ana', Task('Informe', 1, TODAY + 1))
+    runner.changed = NOW + timedelta(minutes=7)
+    assert runner.run(NOW + timedelta(minutes=10)) == [('Informe', '1d')]
+    assert runner.run(NOW + timedelta(minutes=15)) == []
+
+
+def test_ledger_by_name_is_claimed_by_one_task(tmp_path):
+    path = str(tmp_path / 'recordatorios.db')
+    legacy = NotificationLedger(path)
+    legacy.conn.execute("INSERT INTO notices VALUES ('ana', 'Informe', '2030-01-11', '1d', '2030-01-10T08:00:00')")
+    legacy.conn.commit()
+    legacy.close()
+
+    ledger = NotificationLedger(path)
+    first, second = Task('Informe', 1, TODAY + 1, id=1), Task('Informe', 1, TODAY + 1, id=2)
+    assert ledger.was_sent('ana', first, '1d')
+    assert not ledger.was_sent('ana', second, '1d')
+    assert ledger.was_sent('ana', first, '1d')
+    assert ledger.conn.execute('SELECT COUNT(*) FROM notices').fetchone()[0] == 0
+
+
+def test_policy_change_rescans_full_windows(tmp_path):
+    runner = Runner(tmp_path, [Task('+1', 1, TODAY + 1), Task('+4', 1, TODAY + 4), Task('+4 baja', 3, TODAY + 4)])
+    assert runner.run(NOW) == [('+1', '1d')]
+    week = PolicyEngine.from_config([{'name': '1d', 'days_before': 1},
+                                     {'name': '7d', 'days_before': 7, 'priorities': [1]}])
+    assert sorted(runner.run(NOW + timedelta(minutes=5), week)) == [('+1', '7d'), ('+4', '7d')]
+    assert runner.run(NOW + timedelta(minutes=10), week) == []
+
+
+def test_overdue_notice_repeats_daily(tmp_path):
+    policies = PolicyEngine.from_config([{'name': '1d', 'days_before': 1},
+                                         {'name': 'vencida', 'overdue': True, 'max_days': 2}])
+    runner = Runner(tmp_path, [Task('ayer', 1, TODAY - 1)])
+    assert runner.run(NOW, policies) == [('ayer', 'vencida:1')]
+    assert runner.run(NOW + timedelta(hours=1), policies) == []
+    assert runner.run(NOW + timedelta(days=1), policies) == [('ayer', 'vencida:2')]
+    assert runner.run(NOW + timedelta(days=2), policies) == []  # Pasado max_days
+
+
+def test_daemon_does_not_move_the_watermark(tmp_path):
+    storage = open_json(tmp_path)
+    storage.add_employee('ana', 'ana@x')
+    storage.add_employee('bob', 'bob@x')
+    storage.add_task('ana', Task('informe', 1, TODAY + 2))
+    changed = [NOW - timedelta(hours=1)]
+    storage.last_modified = lambda: changed[0]
+    ledger = NotificationLedger(str(tmp_path / 'recordatorios.db'))
+
+    def cron(run_at):
+        reminder_run = prepare_reminders(storage, storage.load_employees(), False, run_at, ledger, policies=ONE_DAY)
+        reminder_run.finish([SendResult(email, True) for email, _, _ in reminder_run.plan])
+        return [(employee, task.name) for _, _, items in reminder_run.plan for employee, task, _ in items]
+
+    service = ReminderService(EmployeeManager(storage=storage), EmailNotifier({'from_email': 'avisos@x'}), ledger,
+                              ONE_DAY)
+    service.send_messages = lambda messages: [SendResult(email, True) for email, _ in messages]
+    daemon = ReminderDaemon(service)
+    assert cron(NOW) == []
+    daemon.reload()
+
+    # Bob añade una tarea entre dos recargas del servicio y el servicio avisa luego a ana
+    midnight = datetime(2030, 1, 11, 0, 0)
+    storage.add_task('bob', Task('revisión', 1, TODAY + 2))
+    changed[0] = midnight - timedelta(minutes=1)
+    assert [result.to_email for result in daemon.fire(midnight)] == ['ana@x']
+
+    # La siguiente ejecución de cron revisa la ventana completa: ana ya está avisada y bob no
+    assert cron(midnight + timedelta(minutes=5)) == [('bob', 'revisión')]
+    assert cron(midnight + timedelta(minutes=10)) == []
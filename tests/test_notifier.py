@@ -0,0 +1,34 @@
+"""Conexiones SMTP: un fallo al abrir la sesión no deja el socket abierto."""
+import smtplib
+
+import pytest
+
+from notifier import SMTPSession
+
+
+class FakeSMTP:
+    """Servidor que acepta la conexión y rechaza el login."""
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.closed = False
+        FakeSMTP.opened.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        raise smtplib.SMTPAuthenticationError(535, b'credenciales no validas')
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_login_closes_the_connection(monkeypatch):
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    session = SMTPSession({'smtp_server': 'localhost', 'smtp_port': 25, 'from_email': 'avisos@x', 'password': 'x'})
+    for _ in range(2):  # Como los reintentos del dispatcher
+        with pytest.raises(smtplib.SMTPAuthenticationError):
+            session.connect()
+    assert session.server is None
+    assert [server.closed for server in FakeSMTP.opened] == [True, True]